@@ -3,9 +3,13 @@ Command-line interface for Milan Intelligence collector.
 """
 
 import sys
+import atexit
+import queue
 import logging
 import click
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 from .config import Config
@@ -13,6 +17,14 @@ from .storage import Storage
 from .models import RunStatus
 from .collectors import WebCollector, JobsCollector, AdsCollector, EmailCollector
 
+# (name, collector class, unit reported in the run output), in run order
+COLLECTOR_REGISTRY = [
+    ('web', WebCollector, 'pages'),
+    ('jobs', JobsCollector, 'listings'),
+    ('ads', AdsCollector, 'creatives'),
+    ('email', EmailCollector, 'messages'),
+]
+
 
 def setup_logging(config: Config):
     """
@@ -42,12 +54,14 @@ def setup_logging(config: Config):
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
+    handlers = []
+
     # Console handler
     if log_to_console:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(getattr(logging, log_level))
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
     # File handler
     if log_to_file:
@@ -58,7 +72,72 @@ def setup_logging(config: Config):
         )
         file_handler.setLevel(getattr(logging, log_level))
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    if not handlers:
+        return
+
+    # Collector threads only enqueue records; a background listener does the
+    # formatting and blocking writes
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger.addHandler(QueueHandler(log_queue))
+
+
+def _run_one(name, collector_cls, config: Config, storage: Storage, run_obj):
+    """
+    Run a single collector, capturing any exception.
+
+    Args:
+        name: Collector name
+        collector_cls: Collector class to instantiate
+        config: Configuration object
+        storage: Storage instance
+        run_obj: Current run
+
+    Returns:
+        Tuple of (name, results, error)
+    """
+    try:
+        collector = collector_cls(config, storage, run_obj)
+        return name, collector.collect(), None
+    except Exception as e:
+        return name, None, e
+
+
+def _report_collector(name: str, unit: str, results, error):
+    """
+    Echo the outcome of a collector and tally its counts.
+
+    Args:
+        name: Collector name
+        unit: What the collector counts (pages, listings, ...)
+        results: Collector results, or None if it raised
+        error: Exception raised by the collector, if any
+
+    Returns:
+        Tuple of (observations, errors)
+    """
+    logger = logging.getLogger(__name__)
+    label = name.capitalize()
+
+    click.echo("─" * 70)
+    click.echo(f"{name.upper()} COLLECTOR")
+    click.echo("─" * 70)
+
+    if error is not None:
+        logger.error(f"{label} collector failed: {error}", exc_info=error)
+        click.echo(f"✗ {label} collector error: {error}", err=True)
+        click.echo()
+        return 0, 1
+
+    observations = results.get('observations', 0)
+    click.echo(f"✓ {label}: {observations} {unit} collected")
+    click.echo()
+    return observations, results.get('errors', 0)
 
 
 @click.group()
@@ -110,6 +189,7 @@ def run(config, collectors):
     click.echo("=" * 70)
     click.echo()
 
+    storage = None
     try:
         # Load configuration
         cfg = Config(config)
@@ -120,6 +200,7 @@ def run(config, collectors):
 
         # Initialize storage
         storage = Storage(cfg.get('storage.database_path', 'data/milanintel.db'))
+        storage.configure_for_bulk()
 
         # Create run
         run_obj = storage.create_run(notes=f"CLI run with config: {config}")
@@ -131,15 +212,9 @@ def run(config, collectors):
         if collectors:
             enabled_collectors = [c.strip() for c in collectors.split(',')]
         else:
-            enabled_collectors = []
-            if cfg.is_collector_enabled('web'):
-                enabled_collectors.append('web')
-            if cfg.is_collector_enabled('jobs'):
-                enabled_collectors.append('jobs')
-            if cfg.is_collector_enabled('ads'):
-                enabled_collectors.append('ads')
-            if cfg.is_collector_enabled('email'):
-                enabled_collectors.append('email')
+            enabled_collectors = [
+                name for name, _, _ in COLLECTOR_REGISTRY if cfg.is_collector_enabled(name)
+            ]
 
         if not enabled_collectors:
             click.echo("⚠ No collectors enabled. Check your configuration.")
@@ -156,75 +231,23 @@ def run(config, collectors):
         total_errors = 0
         collector_results = {}
 
-        # Run web collector
-        if 'web' in enabled_collectors:
-            click.echo("─" * 70)
-            click.echo("WEB COLLECTOR")
-            click.echo("─" * 70)
-            try:
-                collector = WebCollector(cfg, storage, run_obj)
-                results = collector.collect()
-                collector_results['web'] = results
-                total_observations += results.get('observations', 0)
-                total_errors += results.get('errors', 0)
-                click.echo(f"✓ Web: {results.get('observations', 0)} pages collected")
-            except Exception as e:
-                logger.error(f"Web collector failed: {e}", exc_info=True)
-                click.echo(f"✗ Web collector error: {e}", err=True)
-                total_errors += 1
-            click.echo()
-
-        # Run jobs collector
-        if 'jobs' in enabled_collectors:
-            click.echo("─" * 70)
-            click.echo("JOBS COLLECTOR")
-            click.echo("─" * 70)
-            try:
-                collector = JobsCollector(cfg, storage, run_obj)
-                results = collector.collect()
-                collector_results['jobs'] = results
-                total_observations += results.get('observations', 0)
-                total_errors += results.get('errors', 0)
-                click.echo(f"✓ Jobs: {results.get('observations', 0)} listings collected")
-            except Exception as e:
-                logger.error(f"Jobs collector failed: {e}", exc_info=True)
-                click.echo(f"✗ Jobs collector error: {e}", err=True)
-                total_errors += 1
-            click.echo()
+        # Collectors are independent and I/O-bound, so run them concurrently
+        # and report each one as it finishes
+        to_run = [entry for entry in COLLECTOR_REGISTRY if entry[0] in enabled_collectors]
 
-        # Run ads collector
-        if 'ads' in enabled_collectors:
-            click.echo("─" * 70)
-            click.echo("ADS COLLECTOR")
-            click.echo("─" * 70)
-            try:
-                collector = AdsCollector(cfg, storage, run_obj)
-                results = collector.collect()
-                collector_results['ads'] = results
-                total_observations += results.get('observations', 0)
-                click.echo(f"✓ Ads: {results.get('observations', 0)} creatives collected")
-            except Exception as e:
-                logger.error(f"Ads collector failed: {e}", exc_info=True)
-                click.echo(f"✗ Ads collector error: {e}", err=True)
-                total_errors += 1
-            click.echo()
+        with ThreadPoolExecutor(max_workers=max(len(to_run), 1)) as executor:
+            futures = {
+                executor.submit(_run_one, name, collector_cls, cfg, storage, run_obj): unit
+                for name, collector_cls, unit in to_run
+            }
 
-        # Run email collector
-        if 'email' in enabled_collectors:
-            click.echo("─" * 70)
-            click.echo("EMAIL COLLECTOR")
-            click.echo("─" * 70)
-            try:
-                collector = EmailCollector(cfg, storage, run_obj)
-                results = collector.collect()
-                collector_results['email'] = results
-                total_observations += results.get('observations', 0)
-                click.echo(f"✓ Email: {results.get('observations', 0)} messages collected")
-            except Exception as e:
-                logger.error(f"Email collector failed: {e}", exc_info=True)
-                click.echo(f"✗ Email collector error: {e}", err=True)
-                total_errors += 1
-            click.echo()
+            for future in as_completed(futures):
+                name, results, error = future.result()
+                observations, errors = _report_collector(name, futures[future], results, error)
+                if results is not None:
+                    collector_results[name] = results
+                total_observations += observations
+                total_errors += errors
 
         # Update run status
         run_obj.finished_at_utc = datetime.utcnow()
@@ -249,6 +272,7 @@ def run(config, collectors):
         stats = storage.get_run_stats(run_obj.id)
         click.echo("Database stats:")
         click.echo(f"  Successful observations: {stats['successful']}")
+        click.echo(f"  Unchanged pages: {stats['unchanged']}")
         click.echo(f"  Errors: {stats['errors']}")
         click.echo(f"  Sources: {stats['sources']}")
         click.echo()
@@ -259,6 +283,9 @@ def run(config, collectors):
         logger.error(f"Fatal error during collection: {e}", exc_info=True)
         click.echo(f"✗ Fatal error: {e}", err=True)
         sys.exit(1)
+    finally:
+        if storage is not None:
+            storage.close()
 
 
 @cli.command()
@@ -276,9 +303,11 @@ def run(config, collectors):
 )
 def status(config, limit):
     """Show recent collection runs and stats."""
+    storage = None
     try:
         cfg = Config(config)
         storage = Storage(cfg.get('storage.database_path', 'data/milanintel.db'))
+        storage.configure_for_bulk()
 
         with storage.get_connection() as conn:
             cursor = conn.cursor()
@@ -319,6 +348,9 @@ def status(config, limit):
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
+    finally:
+        if storage is not None:
+            storage.close()
 
 
 if __name__ == '__main__':
@@ -2,19 +2,50 @@
 Ads collector with pluggable backends for Google and Meta ad libraries.
 """
 
-import json
+import os
 import logging
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from abc import ABC, abstractmethod
 
+import ijson
+import orjson
+
+from ..filecache import FileCache
 from ..models import Observation, SourceType, AdCreative
 from ..utils import compute_hash, make_entity_key
 from .base import BaseCollector
 
 logger = logging.getLogger(__name__)
 
+# Exports at least this large are parsed incrementally instead of loaded whole
+STREAM_THRESHOLD_BYTES = 1024 * 1024
+
+# Background writer: bounded queue depth and items handled per transaction
+WRITE_QUEUE_SIZE = 1024
+WRITE_BATCH_SIZE = 256
+
+# Observation source for each ad platform
+_PLATFORM_SOURCE = {
+    'google': SourceType.AD_GOOGLE,
+    'meta': SourceType.AD_META,
+}
+
+# ijson prefixes of ad objects, keyed by the top-level container's start event
+_STREAM_ITEM_PREFIXES = {
+    'start_array': ('item',),
+    'start_map': ('ads.item', 'data.item'),
+}
+
+
+class UnknownExportStructure(ValueError):
+    """Raised when an export file does not contain a recognizable ad list."""
+
 
 class AdProvider(ABC):
     """Base class for ad data providers."""
@@ -38,20 +69,39 @@ class ManualExportProvider(AdProvider):
     Expected format: JSON array of ad objects or CSV with headers.
     """
 
-    def __init__(self, platform: str, import_path: str, advertiser_name: str):
+    def __init__(
+        self,
+        platform: str,
+        import_path: str,
+        advertiser_name: str,
+        cache: Optional[FileCache] = None
+    ):
         self.platform = platform
         self.import_path = Path(import_path)
         self.advertiser_name = advertiser_name
+        self.cache = cache
         self.logger = logging.getLogger(f"{__name__}.ManualExportProvider")
 
+        # The export format is fixed per platform; pick its parser once
+        # rather than branching on every ad
+        self._ad_parser = {
+            'google': self._parse_google_ad,
+            'meta': self._parse_meta_ad,
+        }.get(platform, self._parse_generic_ad)
+
     def fetch_ads(self) -> List[AdCreative]:
         """Read ads from import directory."""
         self.import_path.mkdir(parents=True, exist_ok=True)
 
         ads = []
 
-        # Look for JSON files
-        json_files = list(self.import_path.glob('*.json'))
+        # Look for JSON files; scandir's cached entry types avoid a stat per
+        # file, and sorting keeps ad order stable across runs
+        with os.scandir(self.import_path) as entries:
+            json_files = sorted(
+                Path(entry.path) for entry in entries
+                if entry.name.endswith('.json') and entry.is_file()
+            )
 
         if not json_files:
             self.logger.warning(
@@ -60,47 +110,152 @@ class ManualExportProvider(AdProvider):
             )
             return []
 
-        for json_file in json_files:
-            self.logger.info(f"Reading ads from {json_file.name}")
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                # Handle different JSON structures
-                if isinstance(data, list):
-                    ad_list = data
-                elif isinstance(data, dict) and 'ads' in data:
-                    ad_list = data['ads']
-                elif isinstance(data, dict) and 'data' in data:
-                    ad_list = data['data']
-                else:
-                    self.logger.warning(f"Unknown JSON structure in {json_file.name}")
-                    continue
+        # Each file is independent; read and parse them concurrently
+        with ThreadPoolExecutor(max_workers=min(16, len(json_files))) as executor:
+            for file_ads in executor.map(self._load_file, json_files):
+                ads.extend(file_ads)
 
-                # Parse each ad
-                for ad_data in ad_list:
-                    try:
-                        ad = self._parse_ad(ad_data)
-                        if ad:
-                            ads.append(ad)
-                    except Exception as e:
-                        self.logger.error(f"Error parsing ad: {e}")
+        self.logger.info(f"Loaded {len(ads)} ads from {len(json_files)} files")
+        return ads
 
-            except Exception as e:
-                self.logger.error(f"Error reading {json_file.name}: {e}")
+    def _load_file(self, json_file: Path) -> List[AdCreative]:
+        """
+        Read and parse a single export file.
+
+        Args:
+            json_file: Path to JSON export
+
+        Returns:
+            List of AdCreative objects (empty on error)
+        """
+        # Parsed results depend on the platform parser and default advertiser
+        cache_tag = f"{self.platform}|{self.advertiser_name}"
+        if self.cache is not None:
+            cached = self.cache.get(json_file, cache_tag)
+            if cached is not None:
+                self.logger.info(f"Using cached parse of {json_file.name}")
+                return cached
+
+        self.logger.info(f"Reading ads from {json_file.name}")
+        ads = []
+
+        try:
+            if json_file.stat().st_size >= STREAM_THRESHOLD_BYTES:
+                ads = self._stream_file(json_file)
+            else:
+                with open(json_file, 'rb') as f:
+                    data = orjson.loads(f.read())
+                ads = self._parse_ads(self._extract_list(data))
+
+        except UnknownExportStructure:
+            self.logger.warning(f"Unknown JSON structure in {json_file.name}")
+            return []
+
+        except Exception as e:
+            self.logger.error(f"Error reading {json_file.name}: {e}")
+            return ads
+
+        if self.cache is not None:
+            self.cache.put(json_file, ads, cache_tag)
 
-        self.logger.info(f"Loaded {len(ads)} ads from {len(json_files)} files")
         return ads
 
-    def _parse_ad(self, data: Dict[str, Any]) -> Optional[AdCreative]:
-        """Parse ad data from JSON."""
-        # Flexible parsing based on platform
-        if self.platform == 'google':
-            return self._parse_google_ad(data)
-        elif self.platform == 'meta':
-            return self._parse_meta_ad(data)
-        else:
-            return self._parse_generic_ad(data)
+    @staticmethod
+    def _extract_list(data: Any) -> List[Dict[str, Any]]:
+        """
+        Get the list of raw ad objects from a decoded export.
+
+        Args:
+            data: Decoded JSON document
+
+        Returns:
+            List of ad objects
+
+        Raises:
+            UnknownExportStructure: If the document has no ad list
+        """
+        match data:
+            case list():
+                return data
+            case {'ads': list() as ads}:
+                return ads
+            case {'data': list() as ads}:
+                return ads
+        raise UnknownExportStructure()
+
+    def _stream_file(self, json_file: Path) -> List[AdCreative]:
+        """
+        Parse a large export incrementally with ijson.
+
+        Each ad object is parsed as soon as it has been decoded, so memory
+        stays flat regardless of file size.
+
+        Args:
+            json_file: Path to JSON export
+
+        Returns:
+            List of AdCreative objects
+
+        Raises:
+            UnknownExportStructure: If the document has no ad list
+        """
+        parsed: Dict[str, List[AdCreative]] = {}
+        top_level = None
+        # Whether each top-level key's (last) value is an array, mirroring
+        # the list() checks in _extract_list
+        top_arrays: Dict[str, bool] = {}
+        current_key = None
+        builder = None
+        item_prefix = None
+
+        with open(json_file, 'rb') as f:
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if top_level is None:
+                    top_level = event
+                    continue
+
+                if prefix == '' and event == 'map_key':
+                    current_key = value
+                    continue
+
+                if current_key is not None:
+                    # First event of a top-level value tells its type
+                    top_arrays[current_key] = event == 'start_array'
+                    current_key = None
+
+                if builder is None:
+                    if event == 'start_map' and prefix in _STREAM_ITEM_PREFIXES.get(top_level, ()):
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+                        item_prefix = prefix
+                    continue
+
+                builder.event(event, value)
+                if event == 'end_map' and prefix == item_prefix:
+                    parsed.setdefault(item_prefix, []).extend(self._parse_ads([builder.value]))
+                    builder = None
+
+        # Same precedence as the in-memory path: list, then 'ads', then 'data'
+        if top_level == 'start_array':
+            return parsed.get('item', [])
+        if top_arrays.get('ads'):
+            return parsed.get('ads.item', [])
+        if top_arrays.get('data'):
+            return parsed.get('data.item', [])
+        raise UnknownExportStructure()
+
+    def _parse_ads(self, ad_list: List[Dict[str, Any]]) -> List[AdCreative]:
+        """Parse a list of raw ad objects, skipping ones that fail."""
+        ads = []
+        parse = self._ad_parser
+        for ad_data in ad_list:
+            try:
+                ad = parse(ad_data)
+                if ad:
+                    ads.append(ad)
+            except Exception as e:
+                self.logger.error(f"Error parsing ad: {e}")
+        return ads
 
     def _parse_google_ad(self, data: Dict[str, Any]) -> Optional[AdCreative]:
         """Parse Google Ads Transparency Center export."""
@@ -220,27 +375,63 @@ class AdsCollector(BaseCollector):
         results = {
             'status': 'completed',
             'observations': 0,
+            'errors': 0,
             'platforms': {}
         }
 
-        # Collect from each platform
+        enabled_platforms = []
         for platform_name, platform_config in platforms.items():
             if not platform_config.get('enabled', False):
                 self.logger.info(f"Platform {platform_name} is disabled")
                 continue
-
-            try:
-                platform_results = self._collect_platform(platform_name, platform_config)
-                results['platforms'][platform_name] = platform_results
-                results['observations'] += platform_results['observations']
-            except Exception as e:
-                self.logger.error(f"Error collecting ads from {platform_name}: {e}")
-                results['platforms'][platform_name] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'observations': 0
+            enabled_platforms.append((platform_name, platform_config))
+
+        # One parse cache shared by all platforms
+        self._file_cache = FileCache(self.artifacts_path / '.filecache')
+
+        # Artifacts and inserts are handled by one writer thread so parsing
+        # can run ahead of disk and database I/O
+        self._queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        # Per platform, ads the writer stored / failed to store; only the
+        # writer thread updates them, and they are read after it is joined
+        self._written = Counter()
+        self._write_errors = Counter()
+        self._writer = threading.Thread(target=self._drain, name='ads-writer', daemon=True)
+        self._writer.start()
+
+        try:
+            # Platforms are independent, so collect them concurrently
+            max_workers = max(1, min(8, len(enabled_platforms)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._collect_platform, name, cfg): name
+                    for name, cfg in enabled_platforms
                 }
 
+                for future in as_completed(futures):
+                    platform_name = futures[future]
+                    try:
+                        results['platforms'][platform_name] = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Error collecting ads from {platform_name}: {e}")
+                        results['platforms'][platform_name] = {
+                            'status': 'error',
+                            'error': str(e),
+                            'observations': 0,
+                            'errors': 1
+                        }
+        finally:
+            # Flush everything queued before reporting
+            self._queue.put(None)
+            self._writer.join()
+
+        # Queued ads only count once the writer has stored them
+        for platform_name, platform_results in results['platforms'].items():
+            platform_results['observations'] = self._written[platform_name]
+            platform_results['errors'] += self._write_errors[platform_name]
+            results['observations'] += platform_results['observations']
+            results['errors'] += platform_results['errors']
+
         self.logger.info(
             f"Ads collection completed: {results['observations']} ads collected"
         )
@@ -271,7 +462,8 @@ class AdsCollector(BaseCollector):
             provider = ManualExportProvider(
                 platform=platform_name,
                 import_path=platform_config.get('import_path', f'imports/{platform_name}_ads/'),
-                advertiser_name=platform_config.get('advertiser_name', 'Milan Laser')
+                advertiser_name=platform_config.get('advertiser_name', 'Milan Laser'),
+                cache=self._file_cache
             )
         elif provider_type == 'api_stub':
             provider = APIStubProvider(
@@ -284,48 +476,93 @@ class AdsCollector(BaseCollector):
         # Fetch ads
         ads = provider.fetch_ads()
 
+        # 'observations' is filled in from the writer's counts by collect()
         results = {
             'status': 'completed',
             'observations': 0,
+            'errors': 0,
             'ads_count': len(ads)
         }
 
-        # Save each ad as observation
-        date_str = datetime.utcnow().strftime('%Y-%m-%d')
+        # Save each ad as observation; one timestamp covers the whole batch
+        observed_at = datetime.utcnow()
+        date_str = observed_at.strftime('%Y-%m-%d')
 
         for ad in ads:
             try:
-                observation = self._save_ad(ad, platform_name, date_str)
-                results['observations'] += 1
+                self._save_ad(ad, platform_name, date_str, observed_at)
             except Exception as e:
                 self.logger.error(f"Error saving ad: {e}")
+                results['errors'] += 1
 
         return results
 
+    def _drain(self):
+        """
+        Writer thread: flush queued artifacts and insert their observations.
+
+        Items are taken in batches of up to WRITE_BATCH_SIZE so each batch is
+        inserted in a single transaction. Stops after the None sentinel.
+        Stored and failed ads are tallied per platform in _written and
+        _write_errors.
+        """
+        done = False
+        while not done:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            observations = []
+            platforms = Counter()
+            for item in batch:
+                if item is None:
+                    done = True
+                    continue
+
+                observation, path_parts, blob = item
+                platform = path_parts[2]
+                try:
+                    # The stored path may differ if the artifact was compressed
+                    observation.raw_path = self.save_binary_artifact(blob, *path_parts)
+                    observations.append(observation)
+                    platforms[platform] += 1
+                except Exception as e:
+                    self.logger.error(f"Error writing artifact {'/'.join(path_parts)}: {e}")
+                    self._write_errors[platform] += 1
+
+            try:
+                self.storage.create_observations(observations)
+                self._written.update(platforms)
+            except Exception as e:
+                self.logger.error(f"Error inserting {len(observations)} ad observations: {e}")
+                self._write_errors.update(platforms)
+
     def _save_ad(
         self,
         ad: AdCreative,
         platform: str,
-        date_str: str
+        date_str: str,
+        observed_at: datetime
     ) -> Observation:
         """
-        Save ad creative as observation.
+        Build an ad's observation and queue it for the writer thread.
+
+        The artifact and database row are written asynchronously by _drain.
 
         Args:
             ad: AdCreative object
             platform: Platform name
             date_str: Date string for file organization
+            observed_at: Observation timestamp (UTC)
 
         Returns:
             Observation object
         """
-        # Determine source type
-        if platform == 'google':
-            source_type = SourceType.AD_GOOGLE
-        elif platform == 'meta':
-            source_type = SourceType.AD_META
-        else:
-            source_type = SourceType.AD_GOOGLE  # Default
+        # Determine source type (unknown platforms default to Google)
+        source_type = _PLATFORM_SOURCE.get(platform, SourceType.AD_GOOGLE)
 
         # Create entity key
         entity_key = make_entity_key(
@@ -335,36 +572,34 @@ class AdsCollector(BaseCollector):
             ad.headline or ''
         )
 
-        # Compute content hash
-        ad_json = json.dumps(ad.__dict__, sort_keys=True, default=str)
-        content_hash = compute_hash(ad_json)
+        # Serialize once: the canonical blob is hashed, stored and written
+        blob = orjson.dumps(ad.to_dict(), option=orjson.OPT_SORT_KEYS, default=str)
+        content_hash = compute_hash(blob)
 
         observation = Observation(
             run_id=self.run.id,
             source=source_type,
             entity_key=entity_key,
             url=ad.landing_page,
-            observed_at_utc=datetime.utcnow(),
+            observed_at_utc=observed_at,
             content_hash=content_hash,
             status='success'
         )
+        observation.parsed_json = blob.decode()
+
+        # Pretty-print the artifact only when asked to
+        if self.config.get('collectors.ads.pretty_json', False):
+            blob = orjson.dumps(
+                ad.to_dict(),
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2,
+                default=str
+            )
 
-        # Save parsed data
-        parsed_json = json.dumps(ad.__dict__, indent=2, default=str)
-        observation.parsed_json = parsed_json
-
-        # Save to file
+        # Hand the artifact and row to the writer thread
         safe_id = (ad.creative_id or entity_key[:16]).replace('/', '_')
-        json_path = self.save_artifact(
-            parsed_json,
-            'ads', date_str, platform, f'{safe_id}.json'
-        )
-
-        observation.raw_path = json_path
-
-        # Save to database
-        self.storage.create_observation(observation)
+        path_parts = ('ads', date_str, platform, f'{safe_id}.json')
+        self._queue.put((observation, path_parts, blob))
 
-        self.logger.debug(f"Saved ad: {ad.creative_id} from {platform}")
+        self.logger.debug(f"Queued ad: {ad.creative_id} from {platform}")
 
         return observation
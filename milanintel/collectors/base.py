@@ -2,11 +2,13 @@
 Base collector class with common functionality.
 """
 
+import os
+import gzip
 import logging
 import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set, Union
 
 from ..config import Config
 from ..storage import Storage
@@ -14,6 +16,13 @@ from ..models import Run
 
 logger = logging.getLogger(__name__)
 
+# JSON artifacts larger than this are gzipped when compression is enabled
+COMPRESS_MIN_BYTES = 4 * 1024
+
+# Text artifacts are encoded and written in slices of this many characters,
+# so a large page is never held as a second, fully encoded copy
+TEXT_WRITE_CHUNK_CHARS = 1024 * 1024
+
 
 class BaseCollector(ABC):
     """Base class for all collectors."""
@@ -33,6 +42,15 @@ class BaseCollector(ABC):
         self.artifacts_path = Path(config.get('storage.artifacts_path', 'artifacts/'))
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
+        # Resolve once; artifact paths are reported relative to the project root
+        self._cwd = Path.cwd()
+        self._artifacts_abs = self.artifacts_path.resolve()
+
+        # Artifact directories already created during this run
+        self._dir_cache: Set[Path] = set()
+
+        self._compress_json = self.config.get('storage.compress_artifacts', False)
+
     @abstractmethod
     def collect(self) -> Dict[str, Any]:
         """
@@ -64,34 +82,33 @@ class BaseCollector(ABC):
         Returns:
             Path object
         """
-        path = self.artifacts_path.joinpath(*path_parts)
-        path.mkdir(parents=True, exist_ok=True)
+        path = self._artifacts_abs.joinpath(*path_parts)
+        if path not in self._dir_cache:
+            path.mkdir(parents=True, exist_ok=True)
+            self._dir_cache.add(path)
         return path
 
-    def save_artifact(self, content: str, *path_parts: str) -> str:
+    def save_artifact(self, content: Union[str, bytes], *path_parts: str) -> str:
         """
         Save artifact to file.
 
         Args:
-            content: Content to save
+            content: Content to save (str is written as UTF-8)
             *path_parts: Path components (relative to artifacts/)
 
         Returns:
-            Relative path to saved file
+            Relative path to saved file (see save_binary_artifact for compression)
         """
-        full_path = self.artifacts_path.joinpath(*path_parts)
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(full_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-
-        # Return path relative to project root
-        return str(full_path.relative_to(Path.cwd()))
+        return self._write_artifact(content, path_parts)
 
     def save_binary_artifact(self, content: bytes, *path_parts: str) -> str:
         """
         Save binary artifact to file.
 
+        With storage.compress_artifacts enabled, JSON over COMPRESS_MIN_BYTES
+        is gzipped and written with a .gz suffix; the returned path reflects
+        this.
+
         Args:
             content: Binary content
             *path_parts: Path components
@@ -99,10 +116,62 @@ class BaseCollector(ABC):
         Returns:
             Relative path to saved file
         """
-        full_path = self.artifacts_path.joinpath(*path_parts)
-        full_path.parent.mkdir(parents=True, exist_ok=True)
+        return self._write_artifact(content, path_parts)
 
-        with open(full_path, 'wb') as f:
-            f.write(content)
+    def artifact_relpath(self, *path_parts: str) -> str:
+        """
+        Get the path an artifact will be reported under, without writing it.
 
-        return str(full_path.relative_to(Path.cwd()))
+        Args:
+            *path_parts: Path components (relative to artifacts/)
+
+        Returns:
+            Path relative to project root (absolute if outside it)
+        """
+        full_path = self._artifacts_abs.joinpath(*path_parts)
+        try:
+            return str(full_path.relative_to(self._cwd))
+        except ValueError:
+            return str(full_path)
+
+    def _write_artifact(self, content: Union[str, bytes], path_parts: tuple) -> str:
+        """Write content to an artifact path with a single open/close."""
+        # Large JSON artifacts compress well; store them as .json.gz
+        if (
+            self._compress_json
+            and path_parts[-1].endswith('.json')
+            and len(content) > COMPRESS_MIN_BYTES
+        ):
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            content = gzip.compress(content, compresslevel=3, mtime=0)
+            path_parts = (*path_parts[:-1], f'{path_parts[-1]}.gz')
+
+        full_path = self._artifacts_abs.joinpath(*path_parts)
+
+        # Only create each directory once per collector
+        parent = full_path.parent
+        if parent not in self._dir_cache:
+            parent.mkdir(parents=True, exist_ok=True)
+            self._dir_cache.add(parent)
+
+        fd = os.open(full_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if isinstance(content, str):
+                for start in range(0, len(content), TEXT_WRITE_CHUNK_CHARS):
+                    chunk = content[start:start + TEXT_WRITE_CHUNK_CHARS]
+                    self._write_all(fd, chunk.encode('utf-8'))
+            else:
+                self._write_all(fd, content)
+        finally:
+            os.close(fd)
+
+        return self.artifact_relpath(*path_parts)
+
+    @staticmethod
+    def _write_all(fd: int, content: bytes):
+        """Write all of content to a file descriptor."""
+        view = memoryview(content)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
@@ -2,25 +2,78 @@
 Email collector via IMAP for monitoring seed inboxes.
 """
 
+import functools
 import imaplib
 import email
-import json
 import logging
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from email.header import decode_header
+from email.message import Message
+from email.parser import BytesHeaderParser
 from email.utils import parsedate_to_datetime
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
-from bs4 import BeautifulSoup
+import orjson
 
 from ..models import Observation, SourceType, Email as EmailModel
 from ..utils import compute_hash, make_entity_key, extract_domain
 from .base import BaseCollector
 
+# bs4 is imported where it is used, so runs without the email collector
+# don't pay for loading it
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
 logger = logging.getLogger(__name__)
 
+# Header blocks from the first fetch phase only need their headers parsed
+_HEADER_PARSER = BytesHeaderParser()
+
+# Patterns used once per message
+_ANGLE_EMAIL_RE = re.compile(r'<(.+?)>')
+_SAFE_SUBJECT_RE = re.compile(r'[^\w\s-]')
+_URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+
+# CSS selectors for preheaders not marked with a plain "preheader" class
+_PREHEADER_SELECTORS = (
+    '[class*="preheader"]',
+    '[style*="display:none"][style*="max-height:0"]',
+    '[style*="mso-hide:all"]',
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _link_strainer():
+    """Strainer keeping only <a href> tags, for parsing a body just for its links."""
+    from bs4 import SoupStrainer
+
+    return SoupStrainer('a', href=True)
+
+
+def _decode_words(header_value) -> str:
+    """Decode RFC 2047 encoded words in a header value."""
+    decoded_parts = decode_header(header_value)
+    decoded_str = ''
+
+    for part, encoding in decoded_parts:
+        if isinstance(part, bytes):
+            try:
+                decoded_str += part.decode(encoding or 'utf-8', errors='ignore')
+            except Exception:
+                decoded_str += part.decode('utf-8', errors='ignore')
+        else:
+            decoded_str += str(part)
+
+    return decoded_str
+
+
+# Encoded senders and subjects repeat verbatim across a mailing campaign
+_decode_words_cached = functools.lru_cache(maxsize=8192)(_decode_words)
+
 
 class EmailCollector(BaseCollector):
     """Collector for email monitoring via IMAP."""
@@ -49,20 +102,33 @@ class EmailCollector(BaseCollector):
             'accounts': {}
         }
 
-        # Collect from each account
-        for account_config in accounts:
-            account_name = account_config.get('name', 'default')
-            try:
-                account_results = self._collect_account(account_name)
-                results['accounts'][account_name] = account_results
-                results['observations'] += account_results['observations']
-            except Exception as e:
-                self.logger.error(f"Error collecting from {account_name}: {e}")
-                results['accounts'][account_name] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'observations': 0
-                }
+        # Messages stay in the inbox across polls; skip ones already stored
+        self._seen_message_ids = self.storage.get_email_message_ids()
+        # Accounts can receive the same message (e.g. list mail); IDs are
+        # claimed under this lock so only one account stores it
+        self._seen_lock = threading.Lock()
+
+        # Accounts are independent and network-bound, so poll them concurrently
+        account_names = [account_config.get('name', 'default') for account_config in accounts]
+        with ThreadPoolExecutor(max_workers=min(8, len(account_names))) as executor:
+            futures = {
+                executor.submit(self._collect_account, name): name
+                for name in account_names
+            }
+
+            for future in as_completed(futures):
+                account_name = futures[future]
+                try:
+                    account_results = future.result()
+                    results['accounts'][account_name] = account_results
+                    results['observations'] += account_results['observations']
+                except Exception as e:
+                    self.logger.error(f"Error collecting from {account_name}: {e}")
+                    results['accounts'][account_name] = {
+                        'status': 'error',
+                        'error': str(e),
+                        'observations': 0
+                    }
 
         self.logger.info(
             f"Email collection completed: {results['observations']} emails collected"
@@ -114,20 +180,46 @@ class EmailCollector(BaseCollector):
 
             # Search for emails since last run (or last 7 days for first run)
             search_criteria = self._build_search_criteria(email_config)
-            _, message_numbers = mail.search(None, search_criteria)
+            if search_criteria.isascii():
+                _, message_numbers = mail.search(None, search_criteria)
+            else:
+                # Non-ASCII domains/keywords need an explicit charset
+                _, message_numbers = mail.search('UTF-8', search_criteria.encode('utf-8'))
 
             message_ids = message_numbers[0].split()
             results['emails_found'] = len(message_ids)
             self.logger.info(f"Found {len(message_ids)} emails matching criteria")
 
-            # Fetch each email
-            for msg_num in message_ids:
+            # Fetch in batches: one FETCH round-trip covers many messages.
+            # Headers come first so only new, matching messages are
+            # downloaded in full.
+            filters = email_config.get('filters', {})
+            batch_size = max(1, self.config.get('collectors.email.fetch_batch_size', 50))
+            for start in range(0, len(message_ids), batch_size):
+                batch = message_ids[start:start + batch_size]
                 try:
-                    observation = self._fetch_email(mail, msg_num, email_config)
-                    if observation:
-                        results['observations'] += 1
+                    headers = self._fetch_batch(mail, batch, '(BODY.PEEK[HEADER])')
+                    wanted = [
+                        msg_num for msg_num, header_bytes in headers
+                        if self._wants_message(header_bytes, filters)
+                    ]
+                    fetched = self._fetch_batch(mail, wanted) if wanted else []
                 except Exception as e:
-                    self.logger.error(f"Error fetching email {msg_num}: {e}")
+                    self.logger.error(f"Error fetching emails {batch[0]}-{batch[-1]}: {e}")
+                    continue
+
+                observations = []
+                for msg_num, email_body in fetched:
+                    try:
+                        observation = self._process_email(msg_num, email_body, email_config)
+                        if observation:
+                            observations.append(observation)
+                    except Exception as e:
+                        self.logger.error(f"Error processing email {msg_num}: {e}")
+
+                # One insert transaction per fetched batch
+                self.storage.create_observations(observations)
+                results['observations'] += len(observations)
 
         finally:
             try:
@@ -181,42 +273,106 @@ class EmailCollector(BaseCollector):
         date_str = since_date.strftime('%d-%b-%Y')
         criteria_parts.append(f'SINCE {date_str}')
 
-        # Filter by sender domains
+        # Filter by sender domain and subject keywords on the server, so
+        # non-matching mail is never downloaded; _passes_filters still
+        # re-checks locally
         filters = config.get('filters', {})
-        from_domains = filters.get('from_domains', [])
 
+        from_domains = filters.get('from_domains', [])
         if from_domains:
-            # IMAP doesn't support OR directly, so we'll fetch all and filter in Python
-            # For now, just use the date filter
-            pass
+            criteria_parts.append(self._or_criteria('FROM', from_domains))
+
+        subject_keywords = filters.get('subject_keywords', [])
+        if subject_keywords:
+            criteria_parts.append(self._or_criteria('SUBJECT', subject_keywords))
 
         criteria = ' '.join(criteria_parts)
         self.logger.debug(f"IMAP search criteria: {criteria}")
 
         return criteria
 
-    def _fetch_email(
+    def _or_criteria(self, key: str, values: List[str]) -> str:
+        """
+        Build an IMAP search key matching any of several values.
+
+        IMAP's OR takes exactly two keys, so N values nest as
+        (OR (KEY "a") (OR (KEY "b") (KEY "c"))).
+
+        Args:
+            key: Search key (FROM, SUBJECT, ...)
+            values: Values to match
+
+        Returns:
+            IMAP search string
+        """
+        clauses = []
+        for value in values:
+            quoted = str(value).replace('\\', '\\\\').replace('"', '\\"')
+            clauses.append(f'({key} "{quoted}")')
+
+        criteria = clauses[-1]
+        for clause in reversed(clauses[:-1]):
+            criteria = f'(OR {clause} {criteria})'
+
+        return criteria
+
+    def _fetch_batch(
         self,
         mail: imaplib.IMAP4_SSL,
+        msg_nums: List[bytes],
+        message_parts: str = '(RFC822)'
+    ) -> List[Tuple[bytes, bytes]]:
+        """
+        Fetch one item for several messages with a single FETCH command.
+
+        Args:
+            mail: IMAP connection
+            msg_nums: Message numbers
+            message_parts: FETCH data item, e.g. '(RFC822)' or
+                '(BODY.PEEK[HEADER])' (PEEK leaves the \\Seen flag alone)
+
+        Returns:
+            List of (message number, fetched bytes) in server order
+        """
+        _, msg_data = mail.fetch(b','.join(msg_nums).decode(), message_parts)
+
+        # imaplib returns a (b'<num> (<item> {size}', data) tuple per message,
+        # each followed by a b')' terminator
+        fetched = []
+        for item in msg_data:
+            if isinstance(item, tuple):
+                fetched.append((item[0].split(None, 1)[0], item[1]))
+
+        return fetched
+
+    def _process_email(
+        self,
         msg_num: bytes,
+        email_body: bytes,
         config: Dict[str, Any]
     ) -> Optional[Observation]:
         """
-        Fetch and parse a single email.
+        Parse a single fetched email and save its artifacts.
+
+        The observation is not written to the database; the caller inserts
+        each batch in bulk.
 
         Args:
-            mail: IMAP connection
             msg_num: Message number
+            email_body: Raw RFC822 message bytes
             config: Email configuration
 
         Returns:
             Observation or None
         """
-        # Fetch email
-        _, msg_data = mail.fetch(msg_num, '(RFC822)')
-        email_body = msg_data[0][1]
         msg = email.message_from_bytes(email_body)
 
+        # Already stored by an earlier poll: skip parsing, hashing and saving
+        message_id = msg.get('Message-ID', '')
+        if message_id and message_id in self._seen_message_ids:
+            self.logger.debug(f"Email {message_id} already collected")
+            return None
+
         # Parse email
         email_data = self._parse_email(msg)
 
@@ -225,6 +381,58 @@ class EmailCollector(BaseCollector):
             self.logger.debug(f"Email {email_data.message_id} filtered out")
             return None
 
+        if not self._claim_message(email_data.message_id):
+            self.logger.debug(f"Email {email_data.message_id} collected by another account")
+            return None
+
+        try:
+            return self._save_email(msg_num, email_body, email_data, config)
+        except Exception:
+            # Not stored, so another account may still collect it
+            if email_data.message_id:
+                with self._seen_lock:
+                    self._seen_message_ids.discard(email_data.message_id)
+            raise
+
+    def _claim_message(self, message_id: Optional[str]) -> bool:
+        """
+        Atomically mark a message as collected.
+
+        Args:
+            message_id: Message-ID header (messages without one are always new)
+
+        Returns:
+            True if the caller should store the message, False if it was
+            already stored or claimed by another account
+        """
+        if not message_id:
+            return True
+
+        with self._seen_lock:
+            if message_id in self._seen_message_ids:
+                return False
+            self._seen_message_ids.add(message_id)
+            return True
+
+    def _save_email(
+        self,
+        msg_num: bytes,
+        email_body: bytes,
+        email_data: EmailModel,
+        config: Dict[str, Any]
+    ) -> Observation:
+        """
+        Build a parsed email's observation and save its artifacts.
+
+        Args:
+            msg_num: Message number
+            email_body: Raw RFC822 message bytes
+            email_data: Parsed email
+            config: Email configuration
+
+        Returns:
+            Observation object
+        """
         self.logger.info(f"Processing email: {email_data.subject}")
 
         # Create observation
@@ -243,13 +451,14 @@ class EmailCollector(BaseCollector):
 
         # Compute content hash
         content_hash = compute_hash(
-            f"{email_data.subject}|{email_data.body_text or email_data.body_html or ''}"
+            email_data.subject,
+            email_data.body_text or email_data.body_html or ''
         )
         observation.content_hash = content_hash
 
         # Save artifacts
         date_str = datetime.utcnow().strftime('%Y-%m-%d')
-        safe_subject = re.sub(r'[^\w\s-]', '', email_data.subject)[:50]
+        safe_subject = _SAFE_SUBJECT_RE.sub('', email_data.subject)[:50]
         safe_subject = safe_subject.replace(' ', '_')
 
         inbox_name = config.get('username', 'default').split('@')[0]
@@ -269,20 +478,17 @@ class EmailCollector(BaseCollector):
             )
 
         # Save parsed data
-        parsed_json = json.dumps(email_data.__dict__, indent=2, default=str)
-        observation.parsed_json = parsed_json
+        parsed_blob = orjson.dumps(email_data, default=str)
+        observation.parsed_json = parsed_blob.decode()
 
         self.save_artifact(
-            parsed_json,
+            parsed_blob,
             'email', date_str, inbox_name, f'{safe_subject}_{msg_num.decode()}_parsed.json'
         )
 
-        # Save to database
-        self.storage.create_observation(observation)
-
         return observation
 
-    def _parse_email(self, msg: email.message.Message) -> EmailModel:
+    def _parse_email(self, msg: Message) -> EmailModel:
         """
         Parse email message.
 
@@ -305,14 +511,7 @@ class EmailCollector(BaseCollector):
         except Exception:
             date = datetime.utcnow()
 
-        # Extract email address from "Name <email@domain.com>" format
-        email_match = re.search(r'<(.+?)>', from_address)
-        if email_match:
-            from_email = email_match.group(1)
-        else:
-            from_email = from_address
-
-        from_domain = extract_domain(f"http://{from_email.split('@')[1] if '@' in from_email else 'unknown'}")
+        from_domain = self._sender_domain(from_address)
 
         # Extract body
         body_text = None
@@ -331,22 +530,36 @@ class EmailCollector(BaseCollector):
                         body_html = part.get_payload(decode=True).decode('utf-8', errors='ignore')
                     except Exception:
                         pass
+
+                # Attachments usually follow the bodies; don't walk them
+                if body_text and body_html:
+                    break
         else:
             content_type = msg.get_content_type()
+            if content_type in ('text/plain', 'text/html'):
+                try:
+                    payload = msg.get_payload(decode=True).decode('utf-8', errors='ignore')
+                    if content_type == 'text/plain':
+                        body_text = payload
+                    else:
+                        body_html = payload
+                except Exception:
+                    pass
+
+        # Parse the HTML body once for both the preheader and the links
+        soup = None
+        preheader = None
+        if body_html:
             try:
-                payload = msg.get_payload(decode=True).decode('utf-8', errors='ignore')
-                if content_type == 'text/plain':
-                    body_text = payload
-                elif content_type == 'text/html':
-                    body_html = payload
-            except Exception:
-                pass
+                from bs4 import BeautifulSoup
 
-        # Extract preheader from HTML
-        preheader = self._extract_preheader(body_html) if body_html else None
+                soup = BeautifulSoup(body_html, 'lxml')
+                preheader = self._extract_preheader(soup)
+            except Exception:
+                soup = None
 
         # Extract links
-        links = self._extract_email_links(body_html or body_text or '')
+        links = self._extract_email_links(body_html or body_text or '', soup)
 
         # Get headers
         headers = {k: self._decode_header(v) for k, v in msg.items()}
@@ -371,34 +584,28 @@ class EmailCollector(BaseCollector):
         if not header_value:
             return ''
 
-        decoded_parts = decode_header(header_value)
-        decoded_str = ''
+        # Header objects (8-bit headers under compat32) aren't hashable
+        if not isinstance(header_value, str):
+            return _decode_words(header_value)
 
-        for part, encoding in decoded_parts:
-            if isinstance(part, bytes):
-                try:
-                    decoded_str += part.decode(encoding or 'utf-8', errors='ignore')
-                except Exception:
-                    decoded_str += part.decode('utf-8', errors='ignore')
-            else:
-                decoded_str += str(part)
+        # Most headers carry no RFC 2047 encoded words
+        if '=?' not in header_value:
+            return header_value
 
-        return decoded_str
+        return _decode_words_cached(header_value)
 
-    def _extract_preheader(self, html: str) -> Optional[str]:
-        """Extract email preheader from HTML."""
+    def _extract_preheader(self, soup: 'BeautifulSoup') -> Optional[str]:
+        """Extract email preheader from a parsed HTML body."""
         try:
-            soup = BeautifulSoup(html, 'lxml')
-
-            # Common preheader patterns
-            preheader_selectors = [
-                '.preheader',
-                '[class*="preheader"]',
-                '[style*="display:none"][style*="max-height:0"]',
-                '[style*="mso-hide:all"]'
-            ]
-
-            for selector in preheader_selectors:
+            # The plain class match doesn't need a CSS selector
+            element = soup.find(class_='preheader')
+            if element:
+                text = element.get_text(strip=True)
+                if text and len(text) > 10:
+                    return text[:200]
+
+            # Other common preheader patterns
+            for selector in _PREHEADER_SELECTORS:
                 element = soup.select_one(selector)
                 if element:
                     text = element.get_text(strip=True)
@@ -409,24 +616,76 @@ class EmailCollector(BaseCollector):
         except Exception:
             return None
 
-    def _extract_email_links(self, content: str) -> List[str]:
-        """Extract links from email content."""
+    def _extract_email_links(
+        self,
+        content: str,
+        soup: Optional['BeautifulSoup'] = None
+    ) -> List[str]:
+        """
+        Extract links from email content.
+
+        Args:
+            content: HTML or plain-text body
+            soup: Already-parsed HTML body, if available
+
+        Returns:
+            Up to 50 unique links
+        """
         links = []
 
-        # Try HTML parsing first
+        # Try HTML parsing first, keeping only anchors if we must parse here
         try:
-            soup = BeautifulSoup(content, 'lxml')
-            for link in soup.find_all('a', href=True):
-                links.append(link['href'])
+            if soup is None:
+                from bs4 import BeautifulSoup
+
+                soup = BeautifulSoup(content, 'lxml', parse_only=_link_strainer())
+            links = [link['href'] for link in soup.find_all('a', href=True)]
         except Exception:
             pass
 
         # Fallback to regex
         if not links:
-            url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-            links = re.findall(url_pattern, content)
+            links = _URL_RE.findall(content)
+
+        # Deduplicate in document order, so the same 50 are kept every run
+        return list(dict.fromkeys(links))[:50]
+
+    def _sender_domain(self, from_address: str) -> str:
+        """Get the sender's domain from a decoded From header."""
+        # Extract email address from "Name <email@domain.com>" format
+        email_match = _ANGLE_EMAIL_RE.search(from_address)
+        if email_match:
+            from_email = email_match.group(1)
+        else:
+            from_email = from_address
+
+        return extract_domain(f"http://{from_email.split('@')[1] if '@' in from_email else 'unknown'}")
+
+    def _wants_message(self, header_bytes: bytes, filters: Dict[str, Any]) -> bool:
+        """
+        Decide from a message's headers alone whether to fetch its body.
+
+        Args:
+            header_bytes: Raw message header block
+            filters: Filter configuration
+
+        Returns:
+            True if the message is new and passes filters
+        """
+        msg = _HEADER_PARSER.parsebytes(header_bytes)
+
+        message_id = msg.get('Message-ID', '')
+        if message_id and message_id in self._seen_message_ids:
+            self.logger.debug(f"Email {message_id} already collected")
+            return False
 
-        return list(set(links))[:50]  # Limit to 50 unique links
+        from_domain = self._sender_domain(self._decode_header(msg.get('From', '')))
+        subject = self._decode_header(msg.get('Subject', ''))
+        if not self._matches_filters(from_domain, subject, filters):
+            self.logger.debug(f"Email {message_id} filtered out")
+            return False
+
+        return True
 
     def _passes_filters(self, email_data: EmailModel, filters: Dict[str, Any]) -> bool:
         """
@@ -439,16 +698,20 @@ class EmailCollector(BaseCollector):
         Returns:
             True if email passes filters
         """
+        return self._matches_filters(email_data.from_domain, email_data.subject, filters)
+
+    def _matches_filters(self, from_domain: str, subject: str, filters: Dict[str, Any]) -> bool:
+        """Apply sender domain and subject keyword filters."""
         # Filter by sender domain
         from_domains = filters.get('from_domains', [])
         if from_domains:
-            if not any(domain in email_data.from_domain for domain in from_domains):
+            if not any(domain in from_domain for domain in from_domains):
                 return False
 
         # Filter by subject keywords
         subject_keywords = filters.get('subject_keywords', [])
         if subject_keywords:
-            subject_lower = email_data.subject.lower()
+            subject_lower = subject.lower()
             if not any(keyword.lower() in subject_lower for keyword in subject_keywords):
                 return False
 
@@ -2,24 +2,108 @@
 Jobs collector for career page and job listings.
 """
 
-import json
 import re
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Set
-from playwright.sync_api import sync_playwright, Browser, Page
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+import orjson
+from selectolax.lexbor import LexborHTMLParser
 
 from ..models import Observation, SourceType, Job
-from ..utils import normalize_html, compute_hash, slugify, make_entity_key
+from ..utils import hash_html, slugify, make_entity_key, clean_url
 from .base import BaseCollector
 
+# Playwright is imported where it is used, so runs without the jobs
+# collector don't pay for loading it
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext, Page
+
 logger = logging.getLogger(__name__)
 
+# Substrings that mark a URL as a job listing
+_JOB_URL_PATTERNS = (
+    '/job/', '/jobs/', '/career/', '/careers/',
+    '/position/', '/positions/', '/opening/', '/openings/',
+    'requisition', 'posting', 'opportunity'
+)
+
+# Link texts that rule out a heuristic job link
+_NON_JOB_LINK_TEXTS = frozenset(('home', 'about', 'contact'))
+
+# Job observations buffered before each bulk insert
+INSERT_BATCH_SIZE = 100
+
+# Default job title selectors; also what job pages wait for before parsing
+_TITLE_SELECTORS = 'h1, .job-title, [data-job-title]'
+
+# href attributes matched by each selector (null for an invalid selector)
+_SELECTOR_HREFS_JS = """
+(selectors) => selectors.map((sel) => {
+    try {
+        return Array.from(document.querySelectorAll(sel), (el) => el.getAttribute('href'));
+    } catch (e) {
+        return null;
+    }
+})
+"""
+
+# Whether each selector parses as CSS (invalid ones throw in querySelector)
+_VALID_SELECTORS_JS = """
+(selectors) => selectors.map((sel) => {
+    try {
+        document.createDocumentFragment().querySelector(sel);
+        return true;
+    } catch (e) {
+        return false;
+    }
+})
+"""
+
+# [href, text] of every link on the page
+_ANCHORS_JS = """
+() => Array.from(
+    document.querySelectorAll('a[href]'),
+    (a) => [a.getAttribute('href'), a.textContent]
+)
+"""
+
+# URL patterns that carry a job ID, tried in order
+_JOB_ID_RES = [
+    re.compile(p) for p in (
+        r'/job/(\d+)',
+        r'/jobs/(\d+)',
+        r'id=(\d+)',
+        r'job_id=(\w+)',
+        r'/(\d+)/?$',
+    )
+]
+
+# Elements whose contents are not page text: lexbor's text() would
+# include them where bs4's get_text() skipped them (noscript fallbacks
+# such as "enable JavaScript" are dropped too)
+_NON_TEXT_TAGS = ['script', 'style', 'noscript', 'template', 'rt', 'rp']
+
+# Requisition ID patterns, matched against the URL and page text
+_REQUISITION_RES = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'req[uisition]*[_-]?(\w+)',
+        r'posting[_-]?(\w+)',
+    )
+]
+
 
 class JobsCollector(BaseCollector):
     """Collector for job listings."""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Waitable form of each selector group, with invalid selectors
+        # dropped; checked once per run
+        self._wait_selectors: Dict[str, str] = {}
+
     def collect(self) -> Dict[str, Any]:
         """
         Collect job listings from careers page.
@@ -41,6 +125,12 @@ class JobsCollector(BaseCollector):
         rate_limit_seconds = self.config.get('collectors.jobs.rate_limit_seconds', 2.0)
         max_jobs = self.config.get('collectors.jobs.max_job_pages', 100)
 
+        # 'networkidle' waits for 500ms without requests, which analytics
+        # beacons can stretch by seconds; by default navigate to
+        # 'domcontentloaded' and then wait only for the content we extract
+        self._wait_until = self.config.get('collectors.jobs.wait_until', 'domcontentloaded')
+        self._selector_timeout = self.config.get('collectors.jobs.selector_timeout_ms', 10000)
+
         results = {
             'status': 'completed',
             'observations': 0,
@@ -48,14 +138,22 @@ class JobsCollector(BaseCollector):
             'errors': 0
         }
 
+        # Observations are inserted in batches rather than one per job
+        observations = []
+
+        from playwright.sync_api import sync_playwright
+
         with sync_playwright() as playwright:
             browser = playwright.chromium.launch(
                 headless=self.config.get('collectors.web.headless', True)
             )
 
+            # One context for the whole run; each URL only gets a new page
+            context = browser.new_context()
+
             try:
                 # Step 1: Collect careers page and extract job links
-                job_urls = self._extract_job_links(browser, careers_url)
+                job_urls = self._extract_job_links(context, careers_url)
                 results['jobs_found'] = len(job_urls)
                 self.logger.info(f"Found {len(job_urls)} job listings")
 
@@ -65,14 +163,27 @@ class JobsCollector(BaseCollector):
                         self.rate_limit(rate_limit_seconds)
 
                     try:
-                        observation = self._collect_job(browser, job_url)
+                        observations.append(self._collect_job(context, job_url))
                         results['observations'] += 1
                     except Exception as e:
                         self.logger.error(f"Error collecting job {job_url}: {e}")
                         results['errors'] += 1
 
+                    if len(observations) >= INSERT_BATCH_SIZE:
+                        self._insert_observations(observations, results)
+                        observations = []
+
             finally:
-                browser.close()
+                # Close the browser first so a failed insert can't leave
+                # Chromium running, and log that failure rather than let it
+                # replace an exception already in flight
+                try:
+                    try:
+                        context.close()
+                    finally:
+                        browser.close()
+                finally:
+                    self._insert_observations(observations, results)
 
         self.logger.info(
             f"Jobs collection completed: {results['observations']} jobs collected, "
@@ -81,12 +192,29 @@ class JobsCollector(BaseCollector):
 
         return results
 
-    def _extract_job_links(self, browser: Browser, careers_url: str) -> List[str]:
+    def _insert_observations(self, observations: List[Observation], results: Dict[str, Any]):
+        """
+        Insert a batch of job observations, logging a failure instead of
+        raising so one bad batch doesn't abort the crawl.
+
+        Args:
+            observations: Observations to insert
+            results: Collection results; a failed batch moves its jobs from
+                observations to errors
+        """
+        try:
+            self.storage.create_observations(observations)
+        except Exception as e:
+            self.logger.error(f"Error inserting {len(observations)} job observations: {e}")
+            results['observations'] -= len(observations)
+            results['errors'] += len(observations)
+
+    def _extract_job_links(self, context: 'BrowserContext', careers_url: str) -> List[str]:
         """
         Extract job listing links from careers page.
 
         Args:
-            browser: Playwright browser
+            context: Playwright browser context
             careers_url: Careers page URL
 
         Returns:
@@ -94,17 +222,14 @@ class JobsCollector(BaseCollector):
         """
         self.logger.info(f"Extracting job links from {careers_url}")
 
-        context = browser.new_context()
         page = context.new_page()
 
-        job_urls: Set[str] = set()
+        # Keyed by the URL without tracking parameters, so the same posting
+        # linked with different query strings is only visited once
+        job_urls: Dict[str, str] = {}
 
         try:
-            page.goto(careers_url, timeout=30000, wait_until='networkidle')
-            html = page.content()
-
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(html, 'lxml')
+            page.goto(careers_url, timeout=30000, wait_until=self._wait_until)
 
             # Try multiple selectors from config
             selectors = self.config.get('collectors.jobs.selectors.job_links', '')
@@ -123,63 +248,98 @@ class JobsCollector(BaseCollector):
                     '[data-job-id]',
                 ]
 
+            self._wait_for_content(page, ', '.join(selector_list))
+
+            # Only hrefs are needed from the careers page, so query the live
+            # DOM instead of serializing it with page.content() and re-parsing
+            hrefs_by_selector = page.evaluate(_SELECTOR_HREFS_JS, selector_list)
+
             # Try each selector
-            for selector in selector_list:
-                try:
-                    links = soup.select(selector)
-                    for link in links:
-                        href = link.get('href')
-                        if href:
-                            # Make absolute URL
-                            if href.startswith('/'):
-                                from urllib.parse import urljoin
-                                href = urljoin(careers_url, href)
-                            elif not href.startswith('http'):
-                                continue
-
-                            # Filter out non-job links
-                            if self._looks_like_job_url(href):
-                                job_urls.add(href)
-                except Exception as e:
-                    self.logger.debug(f"Selector {selector} failed: {e}")
+            for selector, hrefs in zip(selector_list, hrefs_by_selector):
+                if hrefs is None:
+                    self.logger.debug(f"Selector {selector} failed")
+                    continue
+
+                for href in hrefs:
+                    if href:
+                        # Make absolute URL
+                        if href.startswith('/'):
+                            href = urljoin(careers_url, href)
+                        elif not href.startswith('http'):
+                            continue
+
+                        # Filter out non-job links
+                        if self._looks_like_job_url(href):
+                            job_urls.setdefault(clean_url(href), href)
 
             # If no jobs found with CSS selectors, try finding links heuristically
             if not job_urls:
                 self.logger.info("No jobs found with selectors, trying heuristic approach")
-                for link in soup.find_all('a', href=True):
-                    href = link.get('href')
+                for href, text in page.evaluate(_ANCHORS_JS):
+                    href = href or ''
                     if href.startswith('/'):
-                        from urllib.parse import urljoin
                         href = urljoin(careers_url, href)
 
                     if self._looks_like_job_url(href):
                         # Check if link text suggests it's a job
-                        text = link.get_text(strip=True).lower()
-                        if text and len(text) > 5 and not text in ['home', 'about', 'contact']:
-                            job_urls.add(href)
+                        text = (text or '').strip().lower()
+                        if text and len(text) > 5 and text not in _NON_JOB_LINK_TEXTS:
+                            job_urls.setdefault(clean_url(href), href)
 
         finally:
             page.close()
-            context.close()
 
-        return list(job_urls)
+        return list(job_urls.values())
+
+    def _wait_for_content(self, page: 'Page', selectors: str):
+        """
+        Wait for any of the given selectors after a fast navigation.
+
+        The selectors are waited on as one selector list, so a single
+        invalid one would fail the whole wait at once; each is checked the
+        first time its group is seen and invalid ones are dropped. If none
+        appears before the timeout, extraction proceeds with whatever has
+        rendered so far.
+
+        Args:
+            page: Playwright page
+            selectors: Comma-separated CSS selectors
+        """
+        if self._wait_until == 'networkidle':
+            return
+
+        wait_selectors = self._wait_selectors.get(selectors)
+        if wait_selectors is None:
+            selector_list = [s.strip() for s in selectors.split(',')]
+            valid = page.evaluate(_VALID_SELECTORS_JS, selector_list)
+            for selector, ok in zip(selector_list, valid):
+                if not ok:
+                    self.logger.warning(f"Invalid selector {selector!r}; not waiting on it")
+            wait_selectors = ', '.join(s for s, ok in zip(selector_list, valid) if ok)
+            self._wait_selectors[selectors] = wait_selectors
+
+        if not wait_selectors:
+            return
+
+        try:
+            page.wait_for_selector(wait_selectors, timeout=self._selector_timeout)
+        except Exception as e:
+            self.logger.debug(f"No match for {wait_selectors} on {page.url}: {e}")
 
     def _looks_like_job_url(self, url: str) -> bool:
         """Check if URL looks like a job listing."""
         url_lower = url.lower()
-        job_patterns = [
-            '/job/', '/jobs/', '/career/', '/careers/',
-            '/position/', '/positions/', '/opening/', '/openings/',
-            'requisition', 'posting', 'opportunity'
-        ]
-        return any(pattern in url_lower for pattern in job_patterns)
-
-    def _collect_job(self, browser: Browser, job_url: str) -> Observation:
+        return any(pattern in url_lower for pattern in _JOB_URL_PATTERNS)
+
+    def _collect_job(self, context: 'BrowserContext', job_url: str) -> Observation:
         """
         Collect a single job detail page.
 
+        The observation is not written to the database; collect() inserts
+        observations in batches.
+
         Args:
-            browser: Playwright browser
+            context: Playwright browser context
             job_url: Job detail URL
 
         Returns:
@@ -187,7 +347,6 @@ class JobsCollector(BaseCollector):
         """
         self.logger.info(f"Collecting job: {job_url}")
 
-        context = browser.new_context()
         page = context.new_page()
 
         observation = Observation(
@@ -199,7 +358,11 @@ class JobsCollector(BaseCollector):
         )
 
         try:
-            page.goto(job_url, timeout=30000, wait_until='networkidle')
+            page.goto(job_url, timeout=30000, wait_until=self._wait_until)
+            self._wait_for_content(
+                page,
+                self.config.get('collectors.jobs.selectors', {}).get('title', _TITLE_SELECTORS)
+            )
             html = page.content()
 
             # Parse job data
@@ -210,8 +373,7 @@ class JobsCollector(BaseCollector):
             observation.entity_key = job_key
 
             # Compute content hash
-            normalized = normalize_html(html)
-            content_hash = compute_hash(normalized)
+            content_hash = hash_html(html)
             observation.content_hash = content_hash
 
             # Save artifacts
@@ -225,20 +387,20 @@ class JobsCollector(BaseCollector):
             )
             observation.raw_path = raw_path
 
-            # Take screenshot
-            screenshot_bytes = page.screenshot(full_page=True, type='png')
-            screenshot_path = self.save_binary_artifact(
-                screenshot_bytes,
-                'jobs', date_str, job_slug, 'screenshot.png'
-            )
+            # Take screenshot, unless this exact content was already captured
+            screenshot_path = self.storage.get_screenshot_path(job_key, content_hash)
+            if screenshot_path:
+                self.logger.debug(f"Content unchanged, reusing screenshot {screenshot_path}")
+            else:
+                screenshot_path = self._save_screenshot(page, date_str, job_slug)
             observation.screenshot_path = screenshot_path
 
             # Save parsed data
-            parsed_json = json.dumps(job_data.__dict__, indent=2, default=str)
-            observation.parsed_json = parsed_json
+            parsed_blob = orjson.dumps(job_data, default=str)
+            observation.parsed_json = parsed_blob.decode()
 
             self.save_artifact(
-                parsed_json,
+                parsed_blob,
                 'jobs', date_str, job_slug, 'parsed.json'
             )
 
@@ -254,13 +416,36 @@ class JobsCollector(BaseCollector):
 
         finally:
             page.close()
-            context.close()
-
-        # Save observation
-        self.storage.create_observation(observation)
 
         return observation
 
+    def _save_screenshot(self, page: 'Page', date_str: str, job_slug: str) -> str:
+        """
+        Capture and save a full-page screenshot.
+
+        Args:
+            page: Playwright page
+            date_str: Date string for file organization
+            job_slug: Job directory name
+
+        Returns:
+            Relative path to saved screenshot
+        """
+        # JPEG encodes much faster than PNG and is far smaller
+        image_type = self.config.get('collectors.jobs.screenshot_format', 'jpeg')
+        if image_type == 'jpeg':
+            quality = self.config.get('collectors.jobs.screenshot_quality', 70)
+            screenshot_bytes = page.screenshot(full_page=True, type='jpeg', quality=quality)
+            filename = 'screenshot.jpg'
+        else:
+            screenshot_bytes = page.screenshot(full_page=True, type='png')
+            filename = 'screenshot.png'
+
+        return self.save_binary_artifact(
+            screenshot_bytes,
+            'jobs', date_str, job_slug, filename
+        )
+
     def _parse_job(self, html: str, url: str) -> Job:
         """
         Parse job detail page HTML.
@@ -272,49 +457,54 @@ class JobsCollector(BaseCollector):
         Returns:
             Job object
         """
-        soup = BeautifulSoup(html, 'lxml')
+        tree = LexborHTMLParser(html)
         selectors = self.config.get('collectors.jobs.selectors', {})
 
+        # Text fields are read from a copy without script/style contents;
+        # the description keeps the element's full markup
+        text_tree = tree.clone()
+        text_tree.strip_tags(_NON_TEXT_TAGS)
+
         # Extract title
         title = self._extract_with_selectors(
-            soup,
-            selectors.get('title', 'h1, .job-title, [data-job-title]')
+            text_tree,
+            selectors.get('title', _TITLE_SELECTORS)
         )
 
         # Extract location
         location = self._extract_with_selectors(
-            soup,
+            text_tree,
             selectors.get('location', '.job-location, .location, [data-location]')
         )
 
         # Extract department
         department = self._extract_with_selectors(
-            soup,
+            text_tree,
             selectors.get('department', '.job-department, .department')
         )
 
         # Extract employment type
         employment_type = self._extract_with_selectors(
-            soup,
+            text_tree,
             selectors.get('employment_type', '.job-type, .employment-type')
         )
 
         # Extract posted date
         posted_date = self._extract_with_selectors(
-            soup,
+            text_tree,
             selectors.get('posted_date', '.job-posted, .posted-date, time')
         )
 
         # Extract description
         description = self._extract_with_selectors(
-            soup,
+            tree,
             selectors.get('description', '.job-description, .description, .job-content'),
             get_html=True
         )
 
         # Try to extract job ID from URL or HTML
-        job_id = self._extract_job_id(url, soup)
-        requisition_id = self._extract_requisition_id(url, soup)
+        job_id = self._extract_job_id(url, tree)
+        requisition_id = self._extract_requisition_id(url, text_tree)
 
         return Job(
             title=title or "Unknown Position",
@@ -330,62 +520,51 @@ class JobsCollector(BaseCollector):
 
     def _extract_with_selectors(
         self,
-        soup: BeautifulSoup,
+        tree: LexborHTMLParser,
         selectors: str,
         get_html: bool = False
     ) -> Optional[str]:
-        """Extract content using CSS selectors."""
-        selector_list = [s.strip() for s in selectors.split(',')]
+        """
+        Extract content using CSS selectors.
 
-        for selector in selector_list:
+        Selectors are tried in configured order; the first match wins.
+        """
+        for selector in (s.strip() for s in selectors.split(',')):
             try:
-                element = soup.select_one(selector)
+                element = tree.css_first(selector)
                 if element:
                     if get_html:
-                        return str(element)
+                        return element.html
                     else:
-                        return element.get_text(strip=True)
+                        return element.text(strip=True)
             except Exception:
                 continue
 
         return None
 
-    def _extract_job_id(self, url: str, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_job_id(self, url: str, tree: LexborHTMLParser) -> Optional[str]:
         """Extract job ID from URL or HTML."""
         # Try URL patterns
-        patterns = [
-            r'/job/(\d+)',
-            r'/jobs/(\d+)',
-            r'id=(\d+)',
-            r'job_id=(\w+)',
-            r'/(\d+)/?$'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, url)
+        for pattern in _JOB_ID_RES:
+            match = pattern.search(url)
             if match:
                 return match.group(1)
 
         # Try HTML attributes
         for attr in ['data-job-id', 'data-id', 'id']:
-            element = soup.find(attrs={attr: True})
+            element = tree.css_first(f'[{attr}]')
             if element:
-                return element.get(attr)
+                return element.attributes.get(attr)
 
         return None
 
-    def _extract_requisition_id(self, url: str, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_requisition_id(self, url: str, tree: LexborHTMLParser) -> Optional[str]:
         """Extract requisition ID from URL or HTML."""
-        # Look for requisition patterns
-        patterns = [
-            r'req[uisition]*[_-]?(\w+)',
-            r'posting[_-]?(\w+)',
-        ]
-
-        combined = url + ' ' + soup.get_text()
+        combined = url + ' ' + tree.root.text()
 
-        for pattern in patterns:
-            match = re.search(pattern, combined, re.IGNORECASE)
+        # Look for requisition patterns
+        for pattern in _REQUISITION_RES:
+            match = pattern.search(combined)
             if match:
                 return match.group(1)
 
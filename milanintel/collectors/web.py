@@ -1,20 +1,32 @@
 """
-Web page collector using Playwright for dynamic content.
+Web page collector using Playwright for dynamic content, with a plain HTTP
+fast path for static pages.
 """
 
-import json
+import asyncio
 import logging
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from playwright.sync_api import sync_playwright, Browser, Page, TimeoutError as PlaywrightTimeout
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+
+import orjson
 
 from ..models import Observation, SourceType, WebPage
-from ..utils import normalize_html, compute_hash, slugify, extract_links
+from ..utils import hash_html, slugify, extract_domain, extract_tree_links
 from .base import BaseCollector
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+
+# Playwright is imported where it is used, so runs without the web
+# collector don't pay for loading it
+if TYPE_CHECKING:
+    import requests
+    from playwright.async_api import Browser, BrowserContext, Page
 
 logger = logging.getLogger(__name__)
 
+# Links kept per page in parsed.json; extraction stops once this many are found
+MAX_PAGE_LINKS = 100
+
 
 class WebCollector(BaseCollector):
     """Collector for web pages with screenshots."""
@@ -45,35 +57,30 @@ class WebCollector(BaseCollector):
             'pages': []
         }
 
-        # Use Playwright to collect pages
-        with sync_playwright() as playwright:
-            browser = self._launch_browser(playwright)
+        outcomes = asyncio.run(self._collect_all(urls, rate_limit_seconds))
 
-            try:
-                for i, url_config in enumerate(urls):
-                    if i > 0:
-                        self.rate_limit(rate_limit_seconds)
+        # Save all observations in one transaction
+        self.storage.create_observations(
+            [observation for observation, error in outcomes if observation is not None]
+        )
 
-                    try:
-                        observation = self._collect_page(browser, url_config)
-                        results['observations'] += 1
-                        results['pages'].append({
-                            'url': url_config['url'],
-                            'slug': url_config.get('slug', ''),
-                            'status': observation.status
-                        })
-                    except Exception as e:
-                        self.logger.error(f"Error collecting {url_config['url']}: {e}")
-                        results['errors'] += 1
-                        results['pages'].append({
-                            'url': url_config['url'],
-                            'slug': url_config.get('slug', ''),
-                            'status': 'error',
-                            'error': str(e)
-                        })
-
-            finally:
-                browser.close()
+        for url_config, (observation, error) in zip(urls, outcomes):
+            if error is None:
+                results['observations'] += 1
+                results['pages'].append({
+                    'url': url_config['url'],
+                    'slug': url_config.get('slug', ''),
+                    'status': observation.status
+                })
+            else:
+                self.logger.error(f"Error collecting {url_config['url']}: {error}")
+                results['errors'] += 1
+                results['pages'].append({
+                    'url': url_config['url'],
+                    'slug': url_config.get('slug', ''),
+                    'status': 'error',
+                    'error': str(error)
+                })
 
         self.logger.info(
             f"Web collection completed: {results['observations']} pages, "
@@ -82,48 +89,152 @@ class WebCollector(BaseCollector):
 
         return results
 
-    def _launch_browser(self, playwright) -> Browser:
+    async def _collect_all(
+        self,
+        urls: List[Dict[str, str]],
+        rate_limit_seconds: float
+    ) -> List[Tuple[Optional[Observation], Optional[Exception]]]:
+        """
+        Collect all pages concurrently, rate limiting per host.
+
+        Up to collectors.web.concurrency pages load at once. Pages on the
+        same host are still fetched one at a time, rate_limit_seconds apart.
+
+        Args:
+            urls: URL configuration dicts
+            rate_limit_seconds: Delay between requests to the same host
+
+        Returns:
+            (observation, error) per URL, in configuration order
+        """
+        concurrency = max(1, self.config.get('collectors.web.concurrency', 4))
+        semaphore = asyncio.Semaphore(concurrency)
+        host_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        visited_hosts = set()
+
+        render_default = self.config.get('collectors.web.render_js', True)
+
+        async def collect_one(
+            context: Optional['BrowserContext'],
+            session: 'requests.Session',
+            url_config: Dict[str, Any]
+        ):
+            host = extract_domain(url_config['url'])
+            async with host_locks[host]:
+                # Wait out the rate limit before taking a page slot, so a
+                # sleeping host does not hold back other hosts
+                if host in visited_hosts:
+                    await asyncio.sleep(rate_limit_seconds)
+                visited_hosts.add(host)
+
+                async with semaphore:
+                    try:
+                        if url_config.get('render_js', render_default):
+                            return await self._collect_page(context, url_config), None
+                        return await self._collect_static(session, url_config), None
+                    except Exception as e:
+                        return None, e
+
+        import requests
+
+        # Static pages share one keep-alive session, so repeat requests to a
+        # host skip the TCP/TLS handshake
+        with requests.Session() as session:
+            session.headers['User-Agent'] = self.config.get('collectors.web.user_agent')
+
+            # Only start a browser if some page needs JavaScript rendered
+            if not any(url_config.get('render_js', render_default) for url_config in urls):
+                return await asyncio.gather(
+                    *(collect_one(None, session, url_config) for url_config in urls)
+                )
+
+            from playwright.async_api import async_playwright
+
+            async with async_playwright() as playwright:
+                browser = await self._launch_browser(playwright)
+
+                # One context for all URLs; each URL only gets a new page
+                context = await browser.new_context(
+                    viewport={
+                        'width': self.config.get('collectors.web.viewport_width', 1920),
+                        'height': self.config.get('collectors.web.viewport_height', 1080)
+                    },
+                    user_agent=self.config.get('collectors.web.user_agent'),
+                    # Capture at 1x so HiDPI defaults don't multiply screenshot size
+                    device_scale_factor=1
+                )
+                await self._block_resources(context)
+
+                try:
+                    return await asyncio.gather(
+                        *(collect_one(context, session, url_config) for url_config in urls)
+                    )
+                finally:
+                    await context.close()
+                    await browser.close()
+
+    async def _block_resources(self, context: 'BrowserContext'):
+        """
+        Abort requests for resource types the collector doesn't need.
+
+        Blocked types come from collectors.web.block_resource_types. Blocking
+        visual types (image, font, stylesheet) degrades screenshots.
+
+        Args:
+            context: Playwright browser context
+        """
+        blocked = frozenset(self.config.get('collectors.web.block_resource_types', ['media']))
+        if not blocked:
+            return
+
+        async def handle(route):
+            if route.request.resource_type in blocked:
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await context.route('**/*', handle)
+        self.logger.debug(f"Blocking resource types: {', '.join(sorted(blocked))}")
+
+    async def _launch_browser(self, playwright) -> 'Browser':
         """Launch browser with configured options."""
         headless = self.config.get('collectors.web.headless', True)
-        user_agent = self.config.get('collectors.web.user_agent')
 
-        browser = playwright.chromium.launch(headless=headless)
+        browser = await playwright.chromium.launch(headless=headless)
         self.logger.debug(f"Launched browser (headless={headless})")
 
         return browser
 
-    def _collect_page(self, browser: Browser, url_config: Dict[str, str]) -> Observation:
+    async def _collect_page(
+        self,
+        context: 'BrowserContext',
+        url_config: Dict[str, str]
+    ) -> Observation:
         """
         Collect a single web page.
 
         Args:
-            browser: Playwright browser instance
+            context: Playwright browser context
             url_config: URL configuration dict with 'url' and 'slug'
 
         Returns:
-            Observation object
+            Observation object (not yet saved to the database)
         """
+        from playwright.async_api import TimeoutError as PlaywrightTimeout
+
         url = url_config['url']
-        slug = url_config.get('slug', slugify(url))
+        entity_key = slugify(url)
+        slug = url_config.get('slug', entity_key)
 
         self.logger.info(f"Collecting web page: {url}")
 
-        # Create context and page
-        context = browser.new_context(
-            viewport={
-                'width': self.config.get('collectors.web.viewport_width', 1920),
-                'height': self.config.get('collectors.web.viewport_height', 1080)
-            },
-            user_agent=self.config.get('collectors.web.user_agent')
-        )
-
-        page = context.new_page()
+        page = await context.new_page()
         timeout = self.config.get('collectors.web.timeout_ms', 30000)
 
         observation = Observation(
             run_id=self.run.id,
             source=SourceType.WEB,
-            entity_key=slugify(url),
+            entity_key=entity_key,
             url=url,
             observed_at_utc=datetime.utcnow(),
             status='success'
@@ -131,86 +242,243 @@ class WebCollector(BaseCollector):
 
         try:
             # Navigate to page
-            response = page.goto(url, timeout=timeout, wait_until='networkidle')
+            wait_until = self.config.get('collectors.web.wait_until', 'domcontentloaded')
+            response = await page.goto(url, timeout=timeout, wait_until=wait_until)
 
             if response is None:
                 raise Exception("No response received")
 
+            if wait_until != 'networkidle':
+                await self._wait_for_idle(page)
+
             # Check for redirects
             final_url = page.url
             if final_url != url:
                 self.logger.info(f"Redirect detected: {url} -> {final_url}")
                 observation.status = 'redirect'
 
-            # Get HTML content
-            html_content = page.content()
+            # Pass the HTML straight through so _record_page holds the only
+            # reference and can release it before the screenshot
+            await self._record_page(
+                observation, await page.content(), final_url, response.status, slug, page
+            )
 
-            # Parse page data
-            parsed_data = self._parse_page(html_content, final_url, response.status)
+        except PlaywrightTimeout as e:
+            self.logger.error(f"Timeout collecting {url}: {e}")
+            observation.status = 'error'
+            observation.error_message = f"Timeout: {str(e)}"
 
-            # Normalize HTML for hashing
-            normalized_html = normalize_html(html_content)
-            content_hash = compute_hash(normalized_html)
+        except Exception as e:
+            self.logger.error(f"Error collecting {url}: {e}")
+            observation.status = 'error'
+            observation.error_message = str(e)
 
-            observation.content_hash = content_hash
+        finally:
+            await page.close()
 
-            # Save artifacts
-            date_str = datetime.utcnow().strftime('%Y-%m-%d')
-            artifact_dir = self.ensure_artifact_dir('web', date_str, slug)
+        return observation
 
-            # Save raw HTML
-            raw_path = self.save_artifact(
-                html_content,
-                'web', date_str, slug, 'page.html'
-            )
-            observation.raw_path = raw_path
+    async def _collect_static(
+        self,
+        session: 'requests.Session',
+        url_config: Dict[str, Any]
+    ) -> Observation:
+        """
+        Collect a page that needs no JavaScript with a plain HTTP GET.
 
-            # Take screenshot (full page)
-            screenshot_bytes = page.screenshot(full_page=True, type='png')
-            screenshot_path = self.save_binary_artifact(
-                screenshot_bytes,
-                'web', date_str, slug, 'screenshot.png'
-            )
-            observation.screenshot_path = screenshot_path
+        No browser is involved, so no screenshot is taken.
 
-            # Save parsed data
-            parsed_json = json.dumps(parsed_data.__dict__, indent=2, default=str)
-            observation.parsed_json = parsed_json
+        Args:
+            session: Shared HTTP session
+            url_config: URL configuration dict with 'url' and 'slug'
 
-            self.save_artifact(
-                parsed_json,
-                'web', date_str, slug, 'parsed.json'
-            )
+        Returns:
+            Observation object (not yet saved to the database)
+        """
+        url = url_config['url']
+        entity_key = slugify(url)
+        slug = url_config.get('slug', entity_key)
 
-            self.logger.info(
-                f"Collected {url}: hash={content_hash[:8]}, "
-                f"status={parsed_data.status_code}"
-            )
+        self.logger.info(f"Fetching static web page: {url}")
 
-            # Check for changes
-            if self.storage.check_for_changes(observation.entity_key, content_hash):
-                self.logger.info(f"Content changed for {url}")
-            else:
-                self.logger.info(f"No changes detected for {url}")
+        timeout = self.config.get('collectors.web.timeout_ms', 30000) / 1000
 
-        except PlaywrightTimeout as e:
-            self.logger.error(f"Timeout collecting {url}: {e}")
-            observation.status = 'error'
-            observation.error_message = f"Timeout: {str(e)}"
+        observation = Observation(
+            run_id=self.run.id,
+            source=SourceType.WEB,
+            entity_key=entity_key,
+            url=url,
+            observed_at_utc=datetime.utcnow(),
+            status='success'
+        )
+
+        try:
+            response = await asyncio.to_thread(session.get, url, timeout=timeout)
+
+            final_url = response.url
+            if final_url != url:
+                self.logger.info(f"Redirect detected: {url} -> {final_url}")
+                observation.status = 'redirect'
+
+            # requests assumes ISO-8859-1 when the header names no charset
+            if 'charset' not in response.headers.get('Content-Type', '').lower():
+                response.encoding = 'utf-8'
+
+            await self._record_page(
+                observation, response.text, final_url, response.status_code, slug
+            )
 
         except Exception as e:
             self.logger.error(f"Error collecting {url}: {e}")
             observation.status = 'error'
             observation.error_message = str(e)
 
-        finally:
-            page.close()
-            context.close()
+        return observation
 
-        # Save observation to database
-        self.storage.create_observation(observation)
+    async def _record_page(
+        self,
+        observation: Observation,
+        html_content: str,
+        final_url: str,
+        status_code: int,
+        slug: str,
+        page: Optional['Page'] = None
+    ) -> None:
+        """
+        Parse and hash a fetched page and save its artifacts.
 
-        return observation
+        Args:
+            observation: Observation to fill in
+            html_content: Page HTML
+            final_url: URL after redirects
+            status_code: HTTP status code
+            slug: Page slug
+            page: Playwright page to screenshot, if the page was rendered
+        """
+        url = observation.url
+
+        # Parsing, normalization and hashing are CPU-bound; run them in a
+        # single worker call so other pages keep loading
+        parsed_data, content_hash = await asyncio.to_thread(
+            self._process_html, html_content, final_url, status_code
+        )
+
+        observation.content_hash = content_hash
+        parsed_blob = orjson.dumps(parsed_data, default=str)
+        observation.parsed_json = parsed_blob.decode()
+
+        self.logger.info(
+            f"Collected {url}: hash={content_hash[:8]}, "
+            f"status={parsed_data.status_code}"
+        )
+
+        # Unchanged pages only get an observation row; skipping the
+        # HTML, screenshot and parsed.json writes saves megabytes per URL
+        always_snapshot = self.config.get('collectors.web.always_snapshot', False)
+        last_hash = self.storage.get_last_content_hash(observation.entity_key)
+        if last_hash == content_hash and not always_snapshot:
+            self.logger.info(f"No changes detected for {url}")
+            if observation.status == 'success':
+                observation.status = 'unchanged'
+            observation.screenshot_path = self.storage.get_screenshot_path(
+                observation.entity_key, content_hash
+            )
+            return
+
+        self.logger.info(f"Content changed for {url}")
+
+        # Save artifacts
+        date_str = datetime.utcnow().strftime('%Y-%m-%d')
+        self.ensure_artifact_dir('web', date_str, slug)
+
+        # Save raw HTML
+        observation.raw_path = self.save_artifact(
+            html_content,
+            'web', date_str, slug, 'page.html'
+        )
+
+        # The HTML is saved and hashed; release it before the screenshot
+        # bytes arrive so the two are never held at once
+        del html_content
+
+        # Take screenshot (full page)
+        if page is not None:
+            observation.screenshot_path = await self._save_screenshot(page, date_str, slug)
+
+        # Save parsed data
+        self.save_artifact(
+            parsed_blob,
+            'web', date_str, slug, 'parsed.json'
+        )
+
+    def _process_html(
+        self,
+        html: str,
+        url: str,
+        status_code: int
+    ) -> Tuple[WebPage, str]:
+        """
+        Parse a page and compute the hash of its normalized HTML.
+
+        Args:
+            html: Raw page HTML
+            url: Final page URL
+            status_code: HTTP status code
+
+        Returns:
+            Tuple of (parsed page data, content hash)
+        """
+        parsed_data = self._parse_page(html, url, status_code)
+        return parsed_data, hash_html(html)
+
+    async def _save_screenshot(self, page, date_str: str, slug: str) -> str:
+        """
+        Capture and save a full-page screenshot.
+
+        Args:
+            page: Playwright page
+            date_str: Date component of the artifact path
+            slug: Page slug
+
+        Returns:
+            Relative path to saved screenshot
+        """
+        # JPEG is several times smaller than PNG for full-page captures
+        image_type = self.config.get('collectors.web.screenshot_format', 'jpeg')
+        if image_type == 'jpeg':
+            quality = self.config.get('collectors.web.screenshot_quality', 80)
+            screenshot_bytes = await page.screenshot(
+                full_page=True, type='jpeg', quality=quality
+            )
+            filename = 'screenshot.jpg'
+        else:
+            screenshot_bytes = await page.screenshot(full_page=True, type='png')
+            filename = 'screenshot.png'
+
+        return self.save_binary_artifact(
+            screenshot_bytes,
+            'web', date_str, slug, filename
+        )
+
+    async def _wait_for_idle(self, page) -> None:
+        """
+        Give late-loading content a bounded chance to settle.
+
+        Waits for the load event, then for network idle, each capped so a
+        page with long-polling or analytics beacons cannot stall the run.
+
+        Args:
+            page: Playwright page after navigation
+        """
+        from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+        idle_ms = self.config.get('collectors.web.idle_ms', 1500)
+
+        try:
+            await page.wait_for_load_state('load', timeout=5000)
+            await page.wait_for_load_state('networkidle', timeout=idle_ms)
+        except PlaywrightTimeout:
+            self.logger.debug(f"Page did not go idle within {idle_ms}ms: {page.url}")
 
     def _parse_page(self, html: str, url: str, status_code: int) -> WebPage:
         """
@@ -224,25 +492,25 @@ class WebCollector(BaseCollector):
         Returns:
             WebPage object
         """
-        soup = BeautifulSoup(html, 'lxml')
+        tree = LexborHTMLParser(html)
 
         # Extract title
-        title_tag = soup.find('title')
-        title = title_tag.get_text(strip=True) if title_tag else None
+        title_tag = tree.css_first('title')
+        title = title_tag.text(strip=True) if title_tag else None
 
         # Extract meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        description = meta_desc.get('content') if meta_desc else None
+        meta_desc = tree.css_first('meta[name="description"]')
+        description = meta_desc.attributes.get('content') if meta_desc else None
 
-        # Extract canonical URL
-        canonical = soup.find('link', attrs={'rel': 'canonical'})
-        canonical_url = canonical.get('href') if canonical else None
+        # Extract canonical URL (rel is a space-separated token list)
+        canonical = tree.css_first('link[rel~="canonical"]')
+        canonical_url = canonical.attributes.get('href') if canonical else None
 
         # Extract all H1 tags
-        h1_tags = [h1.get_text(strip=True) for h1 in soup.find_all('h1')]
+        h1_tags = [h1.text(strip=True) for h1 in tree.css('h1')]
 
-        # Extract links
-        links = extract_links(soup, url)
+        # Extract links, resolving only as many as are kept
+        links = extract_tree_links(tree, url, limit=MAX_PAGE_LINKS)
 
         return WebPage(
             url=url,
@@ -251,6 +519,6 @@ class WebCollector(BaseCollector):
             canonical_url=canonical_url,
             final_url=url,
             status_code=status_code,
-            links=links[:100],  # Limit to 100 links
+            links=links,
             h1_tags=h1_tags
         )
@@ -10,6 +10,9 @@ from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Cached marker for keys that are absent (or null) in the config
+_MISSING = object()
+
 
 class Config:
     """Configuration manager."""
@@ -24,6 +27,9 @@ class Config:
         self.config_path = Path(config_path)
         self.data: Dict[str, Any] = {}
 
+        # Resolved dot-notation lookups; the config is not modified after load
+        self._cache: Dict[str, Any] = {}
+
         if not self.config_path.exists():
             raise FileNotFoundError(f"Config file not found: {config_path}")
 
@@ -43,17 +49,25 @@ class Config:
         Returns:
             Configuration value
         """
-        keys = key.split('.')
+        try:
+            value = self._cache[key]
+        except KeyError:
+            value = self._cache[key] = self._lookup(key)
+
+        return default if value is _MISSING else value
+
+    def _lookup(self, key: str) -> Any:
+        """Walk the config for a dot-notation key, returning _MISSING if absent."""
         value = self.data
 
-        for k in keys:
+        for k in key.split('.'):
             if isinstance(value, dict):
                 value = value.get(k)
             else:
-                return default
+                return _MISSING
 
             if value is None:
-                return default
+                return _MISSING
 
         return value
 
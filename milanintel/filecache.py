@@ -0,0 +1,106 @@
+"""
+On-disk cache of parsed file contents keyed by file path, validated by
+mtime and size.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of cached values changes to invalidate old entries
+CACHE_VERSION = 3
+
+
+class FileCache:
+    """
+    Pickle-backed cache for values derived from files.
+
+    Each file has one entry, keyed by its path; the entry records the
+    file's mtime and size and is only returned while they still match, so
+    edited files are re-parsed and their entry overwritten in place.
+    """
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+        """
+        self.cache_dir = Path(cache_dir)
+
+    def get(self, path: Path, tag: str = '') -> Optional[Any]:
+        """
+        Get the cached value for a file.
+
+        Args:
+            path: Source file path
+            tag: Extra key component (e.g. parser settings)
+
+        Returns:
+            Cached value, or None on miss
+        """
+        stamp = self._stamp(path)
+        if stamp is None:
+            return None
+
+        entry = self._entry_path(path, tag)
+        try:
+            with open(entry, 'rb') as f:
+                version, mtime_ns, size, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {entry.name}: {e}")
+            return None
+
+        if (version, mtime_ns, size) != (CACHE_VERSION, *stamp):
+            return None
+        return value
+
+    def put(self, path: Path, value: Any, tag: str = ''):
+        """
+        Store a value for a file.
+
+        Args:
+            path: Source file path
+            value: Picklable value
+            tag: Extra key component (e.g. parser settings)
+        """
+        stamp = self._stamp(path)
+        if stamp is None:
+            return
+
+        entry = self._entry_path(path, tag)
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = entry.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(
+                    (CACHE_VERSION, *stamp, value), f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, entry)
+        except Exception as e:
+            logger.warning(f"Could not write cache entry for {path}: {e}")
+
+    @staticmethod
+    def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+        """Get a file's (mtime_ns, size), or None if it can't be stat'd."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _entry_path(self, path: Path, tag: str) -> Path:
+        """Build the cache entry path for a file."""
+        key_source = f"{Path(path).resolve()}|{tag}"
+        key = hashlib.blake2b(
+            key_source.encode('utf-8'), digest_size=16, usedforsecurity=False
+        ).hexdigest()
+        return self.cache_dir / f"{key}.pkl"
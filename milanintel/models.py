@@ -2,7 +2,7 @@
 Data models for the intelligence collection system.
 """
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields, asdict
 from datetime import datetime
 from typing import Optional, Dict, Any
 from enum import Enum
@@ -26,7 +26,7 @@ class SourceType(Enum):
     EMAIL = "email"
 
 
-@dataclass
+@dataclass(slots=True)
 class Run:
     """Represents a collection run."""
     id: Optional[int] = None
@@ -46,7 +46,7 @@ class Run:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Observation:
     """Represents a single observed entity."""
     id: Optional[int] = None
@@ -59,7 +59,7 @@ class Observation:
     raw_path: Optional[str] = None
     screenshot_path: Optional[str] = None
     parsed_json: Optional[str] = None  # JSON string of parsed data
-    status: str = "success"  # success, error, redirect
+    status: str = "success"  # success, error, redirect, unchanged
     error_message: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
@@ -80,7 +80,7 @@ class Observation:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class WebPage:
     """Parsed web page data."""
     url: str
@@ -93,21 +93,21 @@ class WebPage:
     h1_tags: list = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Job:
     """Parsed job listing data."""
     title: str
+    url: str
     location: Optional[str] = None
     department: Optional[str] = None
     employment_type: Optional[str] = None
     posted_date: Optional[str] = None
     description: Optional[str] = None
-    url: str
     job_id: Optional[str] = None
     requisition_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AdCreative:
     """Parsed ad creative data."""
     platform: str  # google, meta
@@ -123,8 +123,12 @@ class AdCreative:
     spend_info: Optional[Dict[str, Any]] = None
     targeting_info: Optional[Dict[str, Any]] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization (shallow)."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
 
-@dataclass
+@dataclass(slots=True)
 class Email:
     """Parsed email data."""
     message_id: str
@@ -4,15 +4,27 @@ SQLite storage layer for observations and runs.
 
 import sqlite3
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 from contextlib import contextmanager
 
 from .models import Run, Observation, RunStatus, SourceType
 
 logger = logging.getLogger(__name__)
 
+_INSERT_OBSERVATION_SQL = """
+    INSERT INTO observations (
+        run_id, source, entity_key, url, observed_at_utc,
+        content_hash, raw_path, screenshot_path, parsed_json,
+        status, error_message
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_INSERT_OBSERVATION_IGNORE_SQL = _INSERT_OBSERVATION_SQL.replace(
+    'INSERT INTO', 'INSERT OR IGNORE INTO', 1
+)
+
 
 class Storage:
     """SQLite storage manager for intelligence data."""
@@ -27,14 +39,73 @@ class Storage:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    @contextmanager
-    def get_connection(self):
-        """Get a database connection context manager."""
+        # Collectors may run concurrently; serialize writes so threads don't
+        # contend for the SQLite write lock
+        self._write_lock = threading.Lock()
+
+        # Shared connection, set by configure_for_bulk(); guarded by an RLock
+        # because callers may nest get_connection() (e.g. status -> stats)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.RLock()
+
+    def configure_for_bulk(self):
+        """
+        Switch to a single long-lived connection tuned for bulk writes.
+
+        Subsequent get_connection() calls reuse this connection instead of
+        opening a new one per call.
+        """
+        if self._conn is not None:
+            return
+
+        conn = self._open_connection(check_same_thread=False)
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+        self._conn = conn
+        logger.debug(f"Using shared connection for {self.db_path}")
+
+    def close(self):
+        """Close the shared connection, if one was opened."""
+        with self._conn_lock:
+            if self._conn is not None:
+                # Re-analyzes tables whose statistics have gone stale; skipped
+                # for read-only use (e.g. status) so it never takes the write
+                # lock while a collection run may be active
+                if self._conn.total_changes:
+                    self._conn.execute("PRAGMA optimize")
+                self._conn.close()
+                self._conn = None
+
+    def _open_connection(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """Open and configure a new SQLite connection."""
         conn = sqlite3.connect(
             self.db_path,
-            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            check_same_thread=check_same_thread
         )
         conn.row_factory = sqlite3.Row
+        # WAL lets readers proceed during writes, and NORMAL sync skips the
+        # per-commit fsync of the rollback journal
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def get_connection(self):
+        """Get a database connection context manager."""
+        if self._conn is not None:
+            with self._conn_lock:
+                try:
+                    yield self._conn
+                    self._conn.commit()
+                except Exception as e:
+                    self._conn.rollback()
+                    logger.error(f"Database error: {e}")
+                    raise
+            return
+
+        conn = self._open_connection()
         try:
             yield conn
             conn.commit()
@@ -88,11 +159,16 @@ class Storage:
                 ON observations (run_id)
             """)
 
+            # Latest observation per entity: one seek to the highest id, and
+            # the hash is read from the index without touching the row
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_observations_entity_key
-                ON observations (entity_key)
+                CREATE INDEX IF NOT EXISTS idx_observations_entity_latest
+                ON observations (entity_key, id, content_hash)
             """)
 
+            # Superseded by idx_observations_entity_latest (same prefix)
+            cursor.execute("DROP INDEX IF EXISTS idx_observations_entity_key")
+
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_observations_content_hash
                 ON observations (content_hash)
@@ -108,6 +184,15 @@ class Storage:
                 ON observations (entity_key, content_hash, run_id)
             """)
 
+            # Give the planner statistics the first time; close() keeps them
+            # current with PRAGMA optimize
+            cursor.execute("""
+                SELECT 1 FROM sqlite_master
+                WHERE type = 'table' AND name = 'sqlite_stat1'
+            """)
+            if cursor.fetchone() is None:
+                cursor.execute("ANALYZE observations")
+
             conn.commit()
             logger.info("Database schema initialized successfully")
 
@@ -127,7 +212,7 @@ class Storage:
             notes=notes
         )
 
-        with self.get_connection() as conn:
+        with self._write_lock, self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO runs (started_at_utc, status, notes)
@@ -149,7 +234,7 @@ class Storage:
         Args:
             run: Run object to update
         """
-        with self.get_connection() as conn:
+        with self._write_lock, self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE runs
@@ -176,29 +261,11 @@ class Storage:
         Returns:
             Observation with ID populated
         """
-        with self.get_connection() as conn:
+        with self._write_lock, self.get_connection() as conn:
             cursor = conn.cursor()
 
             try:
-                cursor.execute("""
-                    INSERT INTO observations (
-                        run_id, source, entity_key, url, observed_at_utc,
-                        content_hash, raw_path, screenshot_path, parsed_json,
-                        status, error_message
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    observation.run_id,
-                    observation.source.value if observation.source else None,
-                    observation.entity_key,
-                    observation.url,
-                    observation.observed_at_utc.isoformat() if observation.observed_at_utc else None,
-                    observation.content_hash,
-                    observation.raw_path,
-                    observation.screenshot_path,
-                    observation.parsed_json,
-                    observation.status,
-                    observation.error_message
-                ))
+                cursor.execute(_INSERT_OBSERVATION_SQL, self._observation_row(observation))
                 observation.id = cursor.lastrowid
             except sqlite3.IntegrityError as e:
                 # Duplicate observation (same entity_key + content_hash in same run)
@@ -214,6 +281,35 @@ class Storage:
 
         return observation
 
+    def create_observations(self, observations: List[Observation]) -> int:
+        """
+        Insert many observations in a single transaction.
+
+        Duplicates (same entity_key + content_hash in the same run) are
+        skipped, as with create_observation. Observation IDs are not
+        populated.
+
+        Args:
+            observations: Observations to insert
+
+        Returns:
+            Number of rows inserted
+        """
+        if not observations:
+            return 0
+
+        # executemany pulls rows from the iterator as it binds them, so the
+        # parameter tuples are never all held in memory at once
+        rows = map(self._observation_row, observations)
+
+        with self._write_lock, self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(_INSERT_OBSERVATION_IGNORE_SQL, rows)
+            inserted = cursor.rowcount
+
+        logger.debug(f"Inserted {inserted} of {len(observations)} observations")
+        return inserted
+
     def get_last_observation(
         self,
         entity_key: str,
@@ -236,14 +332,14 @@ class Storage:
                 cursor.execute("""
                     SELECT * FROM observations
                     WHERE entity_key = ? AND source = ?
-                    ORDER BY observed_at_utc DESC
+                    ORDER BY id DESC
                     LIMIT 1
                 """, (entity_key, source.value))
             else:
                 cursor.execute("""
                     SELECT * FROM observations
                     WHERE entity_key = ?
-                    ORDER BY observed_at_utc DESC
+                    ORDER BY id DESC
                     LIMIT 1
                 """, (entity_key,))
 
@@ -291,6 +387,7 @@ class Storage:
                     COUNT(*) as total,
                     COUNT(CASE WHEN status = 'success' THEN 1 END) as success,
                     COUNT(CASE WHEN status = 'error' THEN 1 END) as errors,
+                    COUNT(CASE WHEN status = 'unchanged' THEN 1 END) as unchanged,
                     COUNT(DISTINCT source) as sources
                 FROM observations
                 WHERE run_id = ?
@@ -301,10 +398,67 @@ class Storage:
             return {
                 'total_observations': row['total'],
                 'successful': row['success'],
+                'unchanged': row['unchanged'],
                 'errors': row['errors'],
                 'sources': row['sources']
             }
 
+    def get_screenshot_path(self, entity_key: str, content_hash: str) -> Optional[str]:
+        """
+        Get the most recent screenshot taken of identical content.
+
+        Args:
+            entity_key: Entity key
+            content_hash: Content hash
+
+        Returns:
+            Screenshot path, or None if this content has no screenshot yet
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT screenshot_path FROM observations
+                WHERE entity_key = ? AND content_hash = ? AND screenshot_path IS NOT NULL
+                ORDER BY observed_at_utc DESC
+                LIMIT 1
+            """, (entity_key, content_hash))
+
+            row = cursor.fetchone()
+            return row['screenshot_path'] if row else None
+
+    def get_email_message_ids(self) -> Set[str]:
+        """
+        Get the Message-IDs of all stored email observations.
+
+        Returns:
+            Set of Message-ID header values
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT DISTINCT json_extract(parsed_json, '$.message_id') AS message_id
+                FROM observations
+                WHERE source = ? AND parsed_json IS NOT NULL
+            """, (SourceType.EMAIL.value,))
+
+            return {row['message_id'] for row in cursor.fetchall() if row['message_id']}
+
+    def _observation_row(self, observation: Observation) -> tuple:
+        """Convert Observation object to an insert parameter tuple."""
+        return (
+            observation.run_id,
+            observation.source.value if observation.source else None,
+            observation.entity_key,
+            observation.url,
+            observation.observed_at_utc.isoformat() if observation.observed_at_utc else None,
+            observation.content_hash,
+            observation.raw_path,
+            observation.screenshot_path,
+            observation.parsed_json,
+            observation.status,
+            observation.error_message
+        )
+
     def _row_to_observation(self, row: sqlite3.Row) -> Observation:
         """Convert database row to Observation object."""
         return Observation(
@@ -322,6 +476,29 @@ class Storage:
             error_message=row['error_message']
         )
 
+    def get_last_content_hash(self, entity_key: str) -> Optional[str]:
+        """
+        Get the content hash of the most recent observation for an entity.
+
+        Answered from idx_observations_entity_latest alone: one seek, no
+        sort and no table row read.
+
+        Args:
+            entity_key: Entity key to lookup
+
+        Returns:
+            Content hash, or None if there is no observation (or it had none)
+        """
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT content_hash FROM observations
+                WHERE entity_key = ?
+                ORDER BY id DESC
+                LIMIT 1
+            """, (entity_key,)).fetchone()
+
+        return row['content_hash'] if row else None
+
     def check_for_changes(self, entity_key: str, current_hash: str) -> bool:
         """
         Check if content has changed since last observation.
@@ -333,8 +510,4 @@ class Storage:
         Returns:
             True if changed (or no previous observation), False if unchanged
         """
-        last_obs = self.get_last_observation(entity_key)
-        if not last_obs:
-            return True
-
-        return last_obs.content_hash != current_hash
+        return self.get_last_content_hash(entity_key) != current_hash
@@ -2,37 +2,366 @@
 Utility functions for hashing, normalization, retries, and more.
 """
 
+import contextlib
+import functools
 import hashlib
+import random
 import re
+import threading
 import time
 import logging
-from typing import Optional, Callable, Any, TypeVar
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-from bs4 import BeautifulSoup, Comment
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, Callable, Any, TypeVar, Union
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse, urljoin
+from selectolax.lexbor import LexborHTMLParser
+
+# bs4 is imported where it is used; it is slow to load and not every
+# command needs it
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
 
-def compute_hash(content: str, algorithm: str = "sha256") -> str:
+# Supported hash constructors; SHA-256 is the default because stored
+# content hashes are compared across runs. BLAKE2b (128-bit) is faster and
+# suits fingerprints that are never persisted, e.g. in-run dedup sets.
+# None of these guard anything, so they are flagged as non-security use
+# (FIPS-restricted OpenSSL builds would otherwise refuse MD5).
+_HASHERS = {
+    'sha256': functools.partial(hashlib.sha256, usedforsecurity=False),
+    'blake2b': functools.partial(hashlib.blake2b, digest_size=16, usedforsecurity=False),
+    'md5': functools.partial(hashlib.md5, usedforsecurity=False),
+}
+
+
+def compute_hash(
+    *parts: Union[str, bytes, bytearray, memoryview],
+    algorithm: str = "sha256"
+) -> str:
     """
     Compute a stable hash of content.
 
+    Several parts hash exactly as if they were joined with '|', but are
+    fed to the hasher one at a time so the joined string is never built.
+
     Args:
-        content: String content to hash
-        algorithm: Hash algorithm (sha256, md5)
+        *parts: String or bytes-like content to hash
+        algorithm: Hash algorithm (sha256, blake2b, md5)
 
     Returns:
         Hex digest of the hash
     """
-    if algorithm == "sha256":
-        return hashlib.sha256(content.encode('utf-8')).hexdigest()
-    elif algorithm == "md5":
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
-    else:
+    hasher = _HASHERS.get(algorithm)
+    if hasher is None:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+
+    h = hasher()
+    for i, part in enumerate(parts):
+        if i:
+            h.update(b'|')
+        # Bytes-like input is hashed in place, without an encode copy
+        h.update(part.encode('utf-8') if isinstance(part, str) else part)
+    return h.hexdigest()
+
+
+# compute_hashes() only spreads work over threads past this many bytes;
+# below it the pool costs more than hashing serially
+_PARALLEL_HASH_MIN_BYTES = 1024 * 1024
+
+
+def compute_hashes(
+    contents: list[Union[bytes, bytearray, memoryview]],
+    algorithm: str = "sha256",
+    max_workers: Optional[int] = None
+) -> list[str]:
+    """
+    Hash many independent blobs, one digest each, in input order.
+
+    hashlib releases the GIL while hashing large buffers, so big batches
+    (re-hashing stored artifacts, backfilling keys) are spread over a
+    thread pool. Inputs must already be bytes so workers run nothing but
+    the hash itself.
+
+    Args:
+        contents: Bytes-like blobs to hash
+        algorithm: Hash algorithm (sha256, blake2b, md5)
+        max_workers: Thread count (default: one per CPU)
+
+    Returns:
+        Hex digests, matching compute_hash() on each blob
+    """
+    hasher = _HASHERS.get(algorithm)
+    if hasher is None:
         raise ValueError(f"Unsupported hash algorithm: {algorithm}")
 
+    def digest(content):
+        return hasher(content).hexdigest()
+
+    workers = max_workers or os.cpu_count() or 1
+    total = sum(map(len, contents))
+    if workers < 2 or len(contents) < 2 or total < _PARALLEL_HASH_MIN_BYTES:
+        return list(map(digest, contents))
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(contents))) as executor:
+        return list(executor.map(digest, contents))
+
+
+# Elements removed from normalized HTML, along with their contents
+_DROPPED_TAGS = frozenset(('script', 'style', 'noscript'))
+
+# Tracking/dynamic attributes removed from normalized HTML
+_DYNAMIC_ATTRS = frozenset((
+    'data-timestamp',
+    'data-session',
+    'data-visitor-id',
+    'data-analytics',
+    'data-gtm',
+    'data-ga',
+))
+
+# URL attribute cleaned of tracking parameters, by tag
+_URL_ATTRS = {'a': 'href', 'link': 'href', 'img': 'src'}
+
+# Normalized HTML is serialized exactly as BeautifulSoup's str() did
+# before the switch to lxml, so content hashes stay comparable with
+# earlier runs: attributes sorted by name, void elements written as
+# '<br/>', space-separated list attributes re-joined with single spaces,
+# and <meta> charset declarations rewritten to utf-8.
+_VOID_TAGS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'menuitem', 'meta', 'param', 'source', 'track', 'wbr',
+    'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex',
+    'nextid', 'spacer',
+))
+_LIST_ATTRS_ANY_TAG = frozenset(('class', 'accesskey', 'dropzone'))
+_LIST_ATTRS = {
+    'a': frozenset(('rel', 'rev')),
+    'link': frozenset(('rel', 'rev')),
+    'td': frozenset(('headers',)),
+    'th': frozenset(('headers',)),
+    'form': frozenset(('accept-charset',)),
+    'object': frozenset(('archive',)),
+    'area': frozenset(('rel',)),
+    'icon': frozenset(('sizes',)),
+    'iframe': frozenset(('sandbox',)),
+    'output': frozenset(('for',)),
+}
+_META_CHARSET_RE = re.compile(r'((^|;)\s*charset=)([^;]*)', re.M)
+
+
+# Characters of HTML fed to the parser at a time by hash_html()
+_HASH_FEED_CHARS = 64 * 1024
+
+
+def _escape_markup(text: str) -> str:
+    """Escape &, < and > for output as HTML text or attribute value."""
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
+
+def _quote_attribute(value: str) -> str:
+    """Quote an escaped attribute value, preferring double quotes."""
+    if '"' not in value:
+        return f'"{value}"'
+    if "'" not in value:
+        return f"'{value}'"
+    return '"' + value.replace('"', '&quot;') + '"'
+
+
+class _HTMLNormalizer:
+    """
+    lxml parser target that writes normalized HTML as the document parses.
+
+    Dropped elements, comments and dynamic attributes are skipped as their
+    events arrive, so no tree is ever built.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget any output, ready for a new document."""
+        self._out = []
+        self._skip_depth = 0  # Nesting depth inside a dropped element
+        self._pending_void = None  # Void start tag awaiting its end event
+
+    def _flush_void(self):
+        # The void element has content after all; write a normal start tag
+        self._out.append(self._pending_void + '>')
+        self._pending_void = None
+
+    def start(self, tag, attrib):
+        if self._skip_depth:
+            if tag in _DROPPED_TAGS:
+                self._skip_depth += 1
+            return
+        if tag in _DROPPED_TAGS:
+            self._skip_depth = 1
+            return
+        if self._pending_void is not None:
+            self._flush_void()
+
+        parts = ['<', tag]
+        if attrib:
+            url_attr = _URL_ATTRS.get(tag)
+            list_attrs = _LIST_ATTRS.get(tag, ())
+            for key in sorted(attrib):
+                if key in _DYNAMIC_ATTRS:
+                    continue
+                value = attrib[key]
+                if key == url_attr:
+                    value = clean_url(value)
+                elif key in _LIST_ATTRS_ANY_TAG or key in list_attrs:
+                    value = ' '.join(value.split())
+                elif tag == 'meta':
+                    value = self._meta_value(key, value, attrib)
+                parts.append(f' {key}={_quote_attribute(_escape_markup(value))}')
+
+        if tag in _VOID_TAGS:
+            self._pending_void = ''.join(parts)
+        else:
+            parts.append('>')
+            self._out.append(''.join(parts))
+
+    @staticmethod
+    def _meta_value(key, value, attrib):
+        if key == 'charset':
+            return 'utf-8'
+        if (
+            key == 'content'
+            and 'charset' not in attrib
+            and attrib.get('http-equiv', '').lower() == 'content-type'
+        ):
+            return _META_CHARSET_RE.sub(lambda m: m.group(1) + 'utf-8', value)
+        return value
+
+    def end(self, tag):
+        if self._skip_depth:
+            if tag in _DROPPED_TAGS:
+                self._skip_depth -= 1
+            return
+        if self._pending_void is not None:
+            self._out.append(self._pending_void + '/>')
+            self._pending_void = None
+        else:
+            self._out.append(f'</{tag}>')
+
+    def data(self, data):
+        if self._skip_depth:
+            return
+        if self._pending_void is not None:
+            self._flush_void()
+        self._out.append(_escape_markup(data))
+
+    def comment(self, text):
+        pass
+
+    def pi(self, target, data):
+        if self._skip_depth:
+            return
+        if self._pending_void is not None:
+            self._flush_void()
+        self._out.append(f'<?{target} {data or ""}>')
+
+    def doctype(self, name, pubid, system):
+        if self._pending_void is not None:
+            self._flush_void()
+        value = name or ''
+        if pubid is not None:
+            value += f' PUBLIC "{pubid}"'
+            if system is not None:
+                value += f' "{system}"'
+        elif system is not None:
+            value += f' SYSTEM "{system}"'
+        self._out.append(f'<!DOCTYPE {value}>\n')
+
+    def drain(self) -> str:
+        """Return the output written so far and forget it."""
+        written = ''.join(self._out)
+        self._out.clear()
+        return written
+
+    def close(self):
+        if self._pending_void is not None:
+            self._flush_void()
+        return ''.join(self._out)
+
+
+class _CollapsingHasher:
+    """
+    Hash normalized HTML as it is written, collapsing whitespace on the way.
+
+    Hashes exactly what normalize_html() returns: words joined by single
+    spaces, except that the space is dropped between '>' and '<'. The word
+    that may continue into the next write is held back.
+    """
+
+    def __init__(self, hasher):
+        self._hasher = hasher
+        self._carry = ''  # Trailing word, possibly incomplete
+        self._last_char = None  # Last character hashed so far
+
+    def write(self, text: str):
+        if self._carry:
+            text = self._carry + text
+        if not text:
+            return
+        words = text.split()
+        self._carry = words.pop() if words and not text[-1].isspace() else ''
+        self._emit(words)
+
+    def _emit(self, words):
+        if not words:
+            return
+        chunk = ' '.join(words).replace('> <', '><')
+        if self._last_char is not None and not (self._last_char == '>' and chunk[0] == '<'):
+            chunk = ' ' + chunk
+        self._last_char = chunk[-1]
+        self._hasher.update(chunk.encode('utf-8'))
+
+    def hexdigest(self) -> str:
+        if self._carry:
+            self._emit([self._carry])
+            self._carry = ''
+        return self._hasher.hexdigest()
+
+
+# Each thread keeps one normalizing parser; a fresh libxml2 parser context
+# costs more than normalizing a small page
+_parser_local = threading.local()
+
+
+@contextlib.contextmanager
+def _normalizing_parser():
+    """
+    Yield this thread's (parser, target) pair, reset for a new document.
+
+    The pair is discarded if parsing fails, so a half-fed parser is never
+    reused.
+    """
+    from lxml import etree
+
+    pair = getattr(_parser_local, 'pair', None)
+    if pair is None:
+        target = _HTMLNormalizer()
+        pair = (etree.HTMLParser(target=target, recover=True), target)
+    else:
+        pair[1].reset()
+
+    # Taken while in use, so a nested call would get its own pair
+    _parser_local.pair = None
+    yield pair
+    _parser_local.pair = pair
+
 
 def normalize_html(html: str) -> str:
     """
@@ -45,53 +374,76 @@ def normalize_html(html: str) -> str:
     - Timestamps and session IDs (common patterns)
     - Excessive whitespace
 
+    The document is serialized straight from lxml's parser events; see
+    _HTMLNormalizer.
+
     Args:
         html: Raw HTML content
 
     Returns:
         Normalized HTML string
     """
-    soup = BeautifulSoup(html, 'lxml')
+    # A leading byte order mark is not content
+    if html.startswith('\ufeff'):
+        html = html[1:]
 
-    # Remove script and style tags
-    for tag in soup(['script', 'style', 'noscript']):
-        tag.decompose()
+    with _normalizing_parser() as (parser, _):
+        parser.feed(html)
+        normalized = parser.close()
 
-    # Remove comments
-    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-        comment.extract()
+    # Collapse whitespace (split() matches the same characters as \s, and
+    # drops leading/trailing runs); once runs are single spaces, whitespace
+    # between tags is always exactly '> <', so a literal replace covers it
+    normalized = ' '.join(normalized.split())
 
-    # Remove common tracking/dynamic attributes
-    dynamic_attrs = [
-        'data-timestamp',
-        'data-session',
-        'data-visitor-id',
-        'data-analytics',
-        'data-gtm',
-        'data-ga',
-    ]
+    return normalized.replace('> <', '><')
 
-    for attr in dynamic_attrs:
-        for tag in soup.find_all(attrs={attr: True}):
-            del tag[attr]
 
-    # Clean up URLs in href and src attributes
-    for tag in soup.find_all(['a', 'link'], href=True):
-        tag['href'] = clean_url(tag['href'])
+def hash_html(html: str, algorithm: str = "sha256") -> str:
+    """
+    Hash normalized HTML without building the normalized string.
 
-    for tag in soup.find_all(['img', 'script'], src=True):
-        tag['src'] = clean_url(tag['src'])
+    Same result as compute_hash(normalize_html(html), algorithm=algorithm),
+    but the document is parsed in slices and each slice's normalized output
+    is hashed and dropped, so memory stays flat however large the page is.
 
-    # Get normalized text
-    normalized = str(soup)
+    Args:
+        html: Raw HTML content
+        algorithm: Hash algorithm (sha256, blake2b, md5)
 
-    # Collapse whitespace
-    normalized = re.sub(r'\s+', ' ', normalized)
-    normalized = re.sub(r'>\s+<', '><', normalized)
+    Returns:
+        Hex digest of the normalized HTML
+    """
+    hasher = _HASHERS.get(algorithm)
+    if hasher is None:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+
+    # A leading byte order mark is not content
+    if html.startswith('\ufeff'):
+        html = html[1:]
+
+    collapser = _CollapsingHasher(hasher())
+
+    with _normalizing_parser() as (parser, target):
+        # Feed at least once, so an empty document parses as in normalize_html
+        for start in range(0, max(len(html), 1), _HASH_FEED_CHARS):
+            parser.feed(html[start:start + _HASH_FEED_CHARS])
+            collapser.write(target.drain())
+        collapser.write(parser.close())
 
-    return normalized.strip()
+    return collapser.hexdigest()
 
 
+# Common tracking parameters, stripped from URL query strings
+_TRACKING_PARAMS = frozenset((
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'gclid', 'fbclid', 'msclkid', '_ga', 'mc_cid', 'mc_eid',
+    'sessionid', 'sid', 'timestamp', '_t', '_hsenc', '_hsmi',
+))
+
+
+# Navigation, footer and asset URLs repeat on every page of a site
+@functools.lru_cache(maxsize=8192)
 def clean_url(url: str) -> str:
     """
     Remove tracking parameters from URLs.
@@ -102,25 +454,26 @@ def clean_url(url: str) -> str:
     Returns:
         Cleaned URL
     """
-    # List of common tracking parameters
-    tracking_params = {
-        'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
-        'gclid', 'fbclid', 'msclkid', '_ga', 'mc_cid', 'mc_eid',
-        'sessionid', 'sid', 'timestamp', '_t', '_hsenc', '_hsmi',
-    }
-
     try:
         parsed = urlparse(url)
-        query_params = parse_qs(parsed.query)
 
-        # Filter out tracking parameters
-        cleaned_params = {
-            k: v for k, v in query_params.items()
-            if k.lower() not in tracking_params
-        }
+        # Most links have no query; the parse/encode round trip below
+        # would only turn '' into ''
+        new_query = parsed.query
+        if new_query:
+            query_params = parse_qs(new_query)
+
+            # Filter out tracking parameters
+            cleaned_params = {
+                k: v for k, v in query_params.items()
+                if k.lower() not in _TRACKING_PARAMS
+            }
+
+            # Re-encoding also canonicalizes the query, which stored
+            # hashes of normalized HTML depend on
+            new_query = urlencode(cleaned_params, doseq=True)
 
         # Rebuild URL
-        new_query = urlencode(cleaned_params, doseq=True)
         cleaned = urlunparse((
             parsed.scheme,
             parsed.netloc,
@@ -136,6 +489,22 @@ def clean_url(url: str) -> str:
         return url
 
 
+# slugify() patterns: characters to drop, and runs to collapse into a hyphen
+_SLUG_STRIP_RE = re.compile(r'[^\w\s-]')
+_SLUG_DASH_RE = re.compile(r'[-\s]+')
+
+# ASCII fast path for slugify(): one translate drops what _SLUG_STRIP_RE
+# drops and turns whitespace into hyphens, leaving only hyphen runs
+_SLUG_ASCII_TABLE = str.maketrans({
+    c: '-' if chr(c).isspace() else None
+    for c in range(128)
+    if not (chr(c).isalnum() or chr(c) in '_-')
+})
+_SLUG_HYPHENS_RE = re.compile(r'-{2,}')
+
+
+# The same URLs and titles are slugified on every run, often more than once
+@functools.lru_cache(maxsize=4096)
 def slugify(text: str) -> str:
     """
     Convert text to a filesystem-safe slug.
@@ -150,8 +519,13 @@ def slugify(text: str) -> str:
     text = text.lower()
 
     # Replace spaces and special chars with hyphens
-    text = re.sub(r'[^\w\s-]', '', text)
-    text = re.sub(r'[-\s]+', '-', text)
+    if text.isascii():
+        text = text.translate(_SLUG_ASCII_TABLE)
+        if '--' in text:
+            text = _SLUG_HYPHENS_RE.sub('-', text)
+    else:
+        text = _SLUG_STRIP_RE.sub('', text)
+        text = _SLUG_DASH_RE.sub('-', text)
 
     # Remove leading/trailing hyphens
     text = text.strip('-')
@@ -199,8 +573,11 @@ def retry_with_backoff(
                 logger.error(f"Failed after {max_attempts} attempts: {e}")
                 raise
 
-            logger.warning(f"Attempt {attempt} failed: {e}. Retrying in {backoff}s...")
-            time.sleep(backoff)
+            # Jitter the delay so callers that failed together don't all
+            # retry at the same moment
+            delay = min(backoff * (0.5 + random.random()), max_backoff)
+            logger.warning(f"Attempt {attempt} failed: {e}. Retrying in {delay:.1f}s...")
+            time.sleep(delay)
 
             # Exponential backoff
             backoff = min(backoff * exponential_base, max_backoff)
@@ -211,6 +588,7 @@ def retry_with_backoff(
     raise RuntimeError("Retry logic error")
 
 
+@functools.lru_cache(maxsize=8192)
 def extract_domain(url: str) -> str:
     """
     Extract domain from URL.
@@ -228,7 +606,7 @@ def extract_domain(url: str) -> str:
         return ""
 
 
-def extract_links(soup: BeautifulSoup, base_url: str = "") -> list:
+def extract_links(soup: 'BeautifulSoup', base_url: str = "") -> list:
     """
     Extract all links from a BeautifulSoup object.
 
@@ -237,7 +615,7 @@ def extract_links(soup: BeautifulSoup, base_url: str = "") -> list:
         base_url: Base URL for resolving relative links
 
     Returns:
-        List of URLs
+        List of unique URLs, in document order
     """
     links = []
 
@@ -246,12 +624,43 @@ def extract_links(soup: BeautifulSoup, base_url: str = "") -> list:
 
         # Handle relative URLs
         if base_url and not href.startswith(('http://', 'https://', '//')):
-            from urllib.parse import urljoin
             href = urljoin(base_url, href)
 
         links.append(href)
 
-    return list(set(links))  # Deduplicate
+    return list(dict.fromkeys(links))  # Deduplicate
+
+
+def extract_tree_links(
+    tree: LexborHTMLParser,
+    base_url: str = "",
+    limit: Optional[int] = None
+) -> list:
+    """
+    Extract links from a selectolax tree.
+
+    Args:
+        tree: selectolax parsed HTML
+        base_url: Base URL for resolving relative links
+        limit: Stop after this many unique links, if set
+
+    Returns:
+        List of unique URLs, in document order
+    """
+    links = {}  # Ordered set
+
+    for node in tree.css('a[href]'):
+        href = node.attributes.get('href') or ''
+
+        # Handle relative URLs
+        if base_url and not href.startswith(('http://', 'https://', '//')):
+            href = urljoin(base_url, href)
+
+        links[href] = None
+        if limit is not None and len(links) >= limit:
+            break
+
+    return list(links)
 
 
 def truncate_text(text: str, max_length: int = 1000) -> str:
@@ -281,33 +690,38 @@ def extract_text_content(html: str) -> str:
     Returns:
         Clean text
     """
-    soup = BeautifulSoup(html, 'lxml')
+    tree = LexborHTMLParser(html)
 
     # Remove script and style tags
-    for tag in soup(['script', 'style', 'noscript']):
-        tag.decompose()
+    tree.strip_tags(['script', 'style', 'noscript'])
 
-    # Get text
-    text = soup.get_text(separator=' ', strip=True)
+    # Get text (from the root, so the <title> is included)
+    text = tree.root.text(separator=' ', strip=True)
 
     # Collapse whitespace
-    text = re.sub(r'\s+', ' ', text)
-
-    return text.strip()
+    return ' '.join(text.split())
 
 
+@functools.lru_cache(maxsize=4096)
 def make_entity_key(*parts: str) -> str:
     """
     Create a stable entity key from multiple parts.
 
+    Results are memoized: bulk mail and ad exports repeat the same
+    sender/subject/creative combinations many times per run. Parts must
+    be hashable (they are strings at every call site).
+
     Args:
         *parts: Parts to combine
 
     Returns:
         Entity key (hash of parts)
     """
-    combined = "|".join(str(p) for p in parts if p)
-    return compute_hash(combined, algorithm="sha256")[:32]
+    return compute_hash(*(str(p) for p in parts if p), algorithm="sha256")[:32]
+
+
+# Size units, each 1024 (2**10) times the previous
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
 
 
 def format_size(size_bytes: int) -> str:
@@ -320,8 +734,7 @@ def format_size(size_bytes: int) -> str:
     Returns:
         Formatted string (e.g., "1.5 MB")
     """
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.1f} PB"
+    # Every 10 bits of magnitude is one unit step
+    magnitude = int(size_bytes) if size_bytes > 0 else 0
+    unit = min(max(magnitude.bit_length() - 1, 0) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (10 * unit)):.1f} {_SIZE_UNITS[unit]}"